@@ -0,0 +1,137 @@
+"""
+Benchmark lineage_cli start-up: wall time of `--help` and of a seeded
+`export` (one process per run, median kept), and a check that neither
+imports the plotting stack. Exits non-zero when a command is over the
+budget or imports a heavy module it should not, so CI can guard it.
+
+`export` cannot avoid importing networkx and NumPy (the tree is a DiGraph,
+the builders import NumPy), which alone can take well over 100 ms on a
+slow machine. The budget therefore applies to each command's time minus
+the import time of the libraries it needs (its floor), i.e. to the part
+the CLI controls; the absolute times are reported too.
+
+    python benchmarks/cli_startup.py --output cli_startup.json
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CLI = REPO_ROOT / "lineage_cli.py"
+
+BUDGET_MS = 200
+# Modules only the visualize/animate subcommands may import
+HEAVY_MODULES = ["matplotlib", "PIL", "dash", "pandas", "torch"]
+
+PROBE = (
+    "import json, sys\n"
+    "import lineage_cli\n"
+    "try:\n"
+    "    lineage_cli.main(sys.argv[1:])\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "print(json.dumps(sorted({name.split('.')[0] for name in sys.modules})), file=sys.stderr)\n"
+)
+
+
+def commands(workdir):
+    """{name: (CLI arguments, modules the command must import)}"""
+    return {
+        "help": (["--help"], []),
+        "export": (["--seed", "0", "export", "--format", "json", "--output", str(workdir / "lineage.json")],
+                   ["numpy", "networkx"]),
+    }
+
+
+def time_python(code, repeat):
+    """Median wall time (ms) of `python -c code`."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def time_command(args, repeat):
+    """Median and best wall time (ms) of `lineage_cli.py args` in a fresh interpreter."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(CLI), *args], cwd=REPO_ROOT, check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def heavy_imports(args):
+    """HEAVY_MODULES imported by running `args` in-process."""
+    result = subprocess.run([sys.executable, "-c", PROBE, *args], cwd=REPO_ROOT, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    loaded = set(json.loads(result.stderr.strip().splitlines()[-1]))
+    return sorted(loaded & set(HEAVY_MODULES))
+
+
+def run_benchmarks(repeat=10, budget_ms=BUDGET_MS):
+    interpreter_ms = time_python("pass", repeat)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (args, required) in commands(Path(tmp)).items():
+            floor_ms = time_python(f"import {', '.join(required)}", repeat) - interpreter_ms if required else 0.0
+            # Warm-up run: fills the OS file cache
+            subprocess.run([sys.executable, str(CLI), *args], cwd=REPO_ROOT, check=True,
+                           stdout=subprocess.DEVNULL)
+            median_ms, best_ms = time_command(args, repeat)
+            heavy = heavy_imports(args)
+            overhead_ms = median_ms - floor_ms
+            results.append(dict(command=name, median_ms=median_ms, best_ms=best_ms, floor_ms=floor_ms,
+                                overhead_ms=overhead_ms, heavy_imports=heavy,
+                                ok=overhead_ms <= budget_ms and not heavy))
+            print(f"{name:>8} median {median_ms:7.1f} ms  best {best_ms:7.1f} ms  "
+                  f"required imports {floor_ms:6.1f} ms  overhead {overhead_ms:7.1f} ms  "
+                  f"heavy imports: {', '.join(heavy) or 'none'}")
+    return {
+        "benchmark": "cli_startup",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "budget_ms": budget_ms,
+        "interpreter_ms": interpreter_ms,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="lineage_cli start-up benchmark")
+    parser.add_argument('--repeat', type=int, default=10, help="Runs per command (median is checked)")
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS,
+                        help="Allowed median start-up time, beyond the imports a command needs")
+    parser.add_argument('--output', type=str, help="Write results JSON here")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.repeat, args.budget_ms)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"✅ Results saved to {args.output}")
+
+    failures = [result for result in report["results"] if not result["ok"]]
+    for result in failures:
+        print(f"❌ {result['command']} {result['overhead_ms']:.1f} ms over its required imports "
+              f"(budget {args.budget_ms:g} ms), heavy imports: {', '.join(result['heavy_imports']) or 'none'}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ All commands within the {args.budget_ms:g} ms budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark lineage serialization: GraphML and node-link JSON (networkx's
+in-memory writers and the streaming ones in export_utils) and the binary
+column format (lineage_binary).
+
+For each tree size, builds an annotated lineage (division_time, syncytial,
+nuclei_count, shared_cytoplasm, fate) and times writing it, reading it
+back into a DiGraph, and for the binary format just opening it
+(memory-mapped). Also reports file size and checks every format round-trips.
+
+    python benchmarks/lineage_serialization.py --output serialization.json
+"""
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from build_initial_lineage import add_syncytial_cells_bulk, build_lineage_tree  # noqa: E402
+from export_utils import iter_graphml, iter_node_link_json, write_chunks  # noqa: E402
+from lineage_binary import read_lineage_binary, write_lineage_binary  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000]
+QUICK_SIZES = [1_000, 10_000]
+FATES = ["neuron", "muscle", "gut", "germline", "progenitor"]
+
+
+def build_tree(num_cells, seed=0):
+    """An annotated lineage with about `num_cells` cells."""
+    rng = np.random.default_rng(seed)
+    tree = build_lineage_tree()
+    add_syncytial_cells_bulk(tree, max(num_cells - tree.number_of_nodes(), 0), rng=rng)
+    fates = rng.choice(FATES, size=tree.number_of_nodes()).tolist()
+    nx.set_node_attributes(tree, dict(zip(tree.nodes, fates)), "fate")
+    return tree
+
+
+def _write_json(tree, path):
+    # The in-memory, indented dump export_json used before it streamed
+    with open(path, "w") as f:
+        json.dump(nx.node_link_data(tree), f, indent=4)
+
+
+def _read_json(path):
+    with open(path) as f:
+        return nx.node_link_graph(json.load(f), directed=True)
+
+
+def _path_size(path):
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.iterdir())
+    return path.stat().st_size
+
+
+FORMATS = {
+    "graphml": ("lineage.graphml", nx.write_graphml, nx.read_graphml),
+    "json": ("lineage.json", _write_json, _read_json),
+    "graphml_stream": ("lineage.graphml", lambda tree, path: write_chunks(iter_graphml(tree), path),
+                       nx.read_graphml),
+    "json_stream": ("lineage.json", lambda tree, path: write_chunks(iter_node_link_json(tree), path), _read_json),
+    "binary": ("lineage.lineage", write_lineage_binary, lambda path: read_lineage_binary(path).to_networkx()),
+}
+
+
+def _same_lineage(a, b):
+    """Same cells, node attributes and edges (GraphML adds its own graph attributes)."""
+    return dict(a.nodes(data=True)) == dict(b.nodes(data=True)) and set(a.edges) == set(b.edges)
+
+
+def _best(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run_benchmarks(sizes, repeat=3, seed=0):
+    results = []
+    workdir = Path(tempfile.mkdtemp(prefix="lineage_bench_"))
+    try:
+        for size in sizes:
+            tree = build_tree(size, seed)
+            for name, (filename, write, read) in FORMATS.items():
+                path = workdir / filename
+                write_seconds, _ = _best(lambda: write(tree, path), repeat)
+                read_seconds, loaded = _best(lambda: read(path), repeat)
+                result = {
+                    "format": name,
+                    "cells": tree.number_of_nodes(),
+                    "write_seconds": write_seconds,
+                    "read_seconds": read_seconds,
+                    "bytes": _path_size(path),
+                    "round_trip": _same_lineage(tree, loaded),
+                }
+                if name == "binary":
+                    result["open_seconds"], _ = _best(lambda: read_lineage_binary(path), repeat)
+                results.append(result)
+                print(f"{name:>14} n={result['cells']:<8} write {write_seconds:8.3f}s  read {read_seconds:8.3f}s  "
+                      f"{result['bytes'] / 1e6:9.2f} MB  round-trip {'✔' if result['round_trip'] else '✘'}")
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "benchmark": "lineage_serialization",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "networkx": nx.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lineage serialization benchmarks")
+    parser.add_argument('--quick', action='store_true', help="Small trees only")
+    parser.add_argument('--sizes', type=int, nargs='+', help="Tree sizes (cells) to benchmark")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, help="Write results JSON here")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    report = run_benchmarks(sizes, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
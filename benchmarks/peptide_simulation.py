@@ -0,0 +1,171 @@
+"""
+Benchmark the peptide–membrane simulation hot loop.
+
+Times peptides/second, residues/second and peak RSS for every combination
+of engine, MAX_PEPTIDE_LENGTH, ENANTIOMERIC_EXCESS and NUM_PEPTIDES, each
+case in a fresh process so peak RSS is per case. Results are written as
+JSON; pass a previous file with --compare to flag throughput regressions.
+
+    python benchmarks/peptide_simulation.py --output bench.json
+    python benchmarks/peptide_simulation.py --compare bench.json
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+ENGINES = ["scalar", "batch"]
+MAX_PEPTIDE_LENGTHS = [60, 120, 240]
+ENANTIOMERIC_EXCESSES = [0.5, 0.7, 0.9]
+NUM_PEPTIDES = [2000, 20000]
+
+QUICK_MATRIX = {
+    "mode": ENGINES,
+    "max_peptide_length": [120],
+    "enantiomeric_excess": [0.5, 0.9],
+    "num_peptides": [2000],
+}
+FULL_MATRIX = {
+    "mode": ENGINES,
+    "max_peptide_length": MAX_PEPTIDE_LENGTHS,
+    "enantiomeric_excess": ENANTIOMERIC_EXCESSES,
+    "num_peptides": NUM_PEPTIDES,
+}
+METRICS = ["peptides_per_second", "residues_per_second"]
+
+
+class _ResidueCounter:
+    """Log sink that only counts residues, so logging I/O stays out of the timing."""
+
+    def __init__(self):
+        self.residues = 0
+
+    def write(self, peptide_row, growth_row, state_row):
+        self.residues += peptide_row["length"]
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(case, repeat, seed):
+    """Run one benchmark case (in a worker process) and return its metrics."""
+    from simulate_peptide_membrane import SimulationConfig, run_simulation
+
+    config = SimulationConfig(log_mode="full", **case)
+    timings = []
+    for i in range(repeat):
+        counter = _ResidueCounter()
+        start = time.perf_counter()
+        run_simulation(config, seed + i, sink=counter)
+        timings.append((time.perf_counter() - start, counter.residues))
+
+    seconds, residues = min(timings)
+    return dict(case,
+                seconds=seconds,
+                peptides_per_second=config.num_peptides / seconds,
+                residues_per_second=residues / seconds,
+                peak_rss_mb=_peak_rss_mb())
+
+
+def iter_cases(matrix):
+    keys = list(matrix)
+    for values in itertools.product(*(matrix[key] for key in keys)):
+        yield dict(zip(keys, values))
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(matrix, repeat=3, seed=0):
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for case in iter_cases(matrix):
+        # A fresh single-use process per case keeps peak RSS independent
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_case, case, repeat, seed).result()
+        results.append(result)
+        print(f"{case['mode']:>6} len={case['max_peptide_length']:<4} ee={case['enantiomeric_excess']:<4} "
+              f"n={case['num_peptides']:<6} {result['peptides_per_second']:>12,.0f} pep/s "
+              f"{result['residues_per_second']:>14,.0f} res/s {result['peak_rss_mb']:>7.1f} MB")
+    return {
+        "benchmark": "peptide_simulation",
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def _case_key(result):
+    return tuple(result[key] for key in FULL_MATRIX)
+
+
+def compare(current, baseline, tolerance):
+    """
+    Cases whose throughput fell by more than `tolerance` (a fraction)
+    relative to the baseline run.
+    """
+    previous = {_case_key(result): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        for metric in METRICS:
+            change = result[metric] / before[metric] - 1
+            if change < -tolerance:
+                regressions.append(dict(case=_case_key(result), metric=metric, change=change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peptide simulation benchmarks")
+    parser.add_argument('--quick', action='store_true', help="Run the small matrix only")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case (best is kept)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, help="Write results JSON here")
+    parser.add_argument('--compare', type=str, help="Baseline results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed fractional throughput drop before a case counts as a regression")
+    args = parser.parse_args()
+
+    report = run_benchmarks(QUICK_MATRIX if args.quick else FULL_MATRIX, args.repeat, args.seed)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+        print(f"✅ Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"❌ {regression['case']} {regression['metric']} {regression['change']:+.1%}")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions against {args.compare} (baseline {baseline.get('revision')})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,87 @@
 import networkx as nx
-import random
+import numpy as np
+
+from lineage_random import as_generator, as_random
+
+# Known early embryonic lineage from literature
+KNOWN_LINEAGE = {
+    "Zygote": ["AB", "P1"],
+    "AB": ["ABa", "ABp"],
+    "P1": ["EMS", "P2"],
+    "EMS": ["MS", "E"],
+    "P2": ["C", "P3"],
+    "P3": ["D", "P4"],
+    "P4": ["Z2", "Z3"]
+}
+
+MINUTES_PER_DIVISION = 5
+SYNCYTIAL_PREFIX = "Sync_"
+
+
+class LineageArrays:
+    """
+    Compact lineage representation in breadth-first order.
+
+    names[i] is the cell at index i, parent[i] the index of its parent
+    (-1 for the root), depth[i] its distance from the root and
+    division_time[i] its approximate division time in minutes.
+    Use to_networkx() for code that still needs a DiGraph.
+    """
+
+    def __init__(self, names, parent, depth, division_time):
+        self.names = list(names)
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.division_time = np.asarray(division_time, dtype=np.int32)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def _from_successors(cls, root, successors):
+        # The names list doubles as the BFS queue, so no recursion is needed
+        names = [root]
+        parent = [-1]
+        depth = [0]
+        seen = {root}
+        head = 0
+        while head < len(names):
+            for child in successors(names[head]):
+                if child in seen:
+                    raise ValueError(f"{child!r} is reachable twice; lineage must be a tree")
+                seen.add(child)
+                names.append(child)
+                parent.append(head)
+                depth.append(depth[head] + 1)
+            head += 1
+        depth = np.asarray(depth, dtype=np.int32)
+        return cls(names, parent, depth, depth * MINUTES_PER_DIVISION)
+
+    @classmethod
+    def from_children(cls, children, root="Zygote"):
+        """Build from a {parent: [children, ...]} mapping such as KNOWN_LINEAGE."""
+        return cls._from_successors(root, lambda name: children.get(name, ()))
+
+    @classmethod
+    def from_networkx(cls, tree, root="Zygote"):
+        """Build from the subtree of a DiGraph reachable from `root`."""
+        return cls._from_successors(root, tree.successors)
+
+    def to_networkx(self):
+        """A DiGraph with a division_time attribute on every node."""
+        tree = nx.DiGraph()
+        division_time = self.division_time.tolist()
+        tree.add_nodes_from((name, {"division_time": t}) for name, t in zip(self.names, division_time))
+        names = self.names
+        tree.add_edges_from((names[p], names[i]) for i, p in enumerate(self.parent.tolist()) if p >= 0)
+        return tree
+
+
+def build_lineage_arrays(known_lineage=KNOWN_LINEAGE, root="Zygote"):
+    """Array-backed version of build_lineage_tree."""
+    return LineageArrays.from_children(known_lineage, root)
+
 
 def build_lineage_tree():
     """
@@ -7,55 +89,82 @@ def build_lineage_tree():
     and known cell relationships.
     Returns a directed graph (DiGraph).
     """
-    lineage_tree = nx.DiGraph()
-
-    # Known early embryonic lineage from literature
-    known_lineage = {
-        "Zygote": ["AB", "P1"],
-        "AB": ["ABa", "ABp"],
-        "P1": ["EMS", "P2"],
-        "EMS": ["MS", "E"],
-        "P2": ["C", "P3"],
-        "P3": ["D", "P4"],
-        "P4": ["Z2", "Z3"]
-    }
-
-    # Add edges and initialize nodes
-    for parent, children in known_lineage.items():
-        for child in children:
-            lineage_tree.add_edge(parent, child)
-
-    # Assign division times based on tree depth
-    assign_division_times(lineage_tree)
-    
-    return lineage_tree
+    return build_lineage_arrays().to_networkx()
 
 
 def assign_division_times(tree, root="Zygote"):
     """Assign approximate division times to all nodes based on depth."""
-    def dfs(node, depth):
-        tree.nodes[node]["division_time"] = depth * 5  # 5 mins per division step
-        for child in tree.successors(node):
-            dfs(child, depth + 1)
-    dfs(root, 0)
+    lineage = LineageArrays.from_networkx(tree, root)
+    nx.set_node_attributes(tree, dict(zip(lineage.names, lineage.division_time.tolist())), "division_time")
 
 
-def annotate_syncytial_cell(tree, node):
-    """Mark a node in the tree as syncytial with metadata."""
+def annotate_syncytial_cell(tree, node, rng=None):
+    """
+    Mark a node in the tree as syncytial with metadata.
+    `rng` is a random.Random, NumPy Generator or seed (None: global random).
+    """
+    rng = as_random(rng)
     tree.nodes[node]["syncytial"] = True
-    tree.nodes[node]["nuclei_count"] = random.randint(2, 8)
+    tree.nodes[node]["nuclei_count"] = rng.randint(2, 8)
     tree.nodes[node]["shared_cytoplasm"] = True
     if "division_time" not in tree.nodes[node]:
-        tree.nodes[node]["division_time"] = random.randint(20, 60)
+        tree.nodes[node]["division_time"] = rng.randint(20, 60)
 
 
-def add_random_syncytial_cells(tree, num_cells=5):
-    """Randomly insert and annotate syncytial cells."""
+def add_random_syncytial_cells(tree, num_cells=5, rng=None):
+    """Randomly insert and annotate syncytial cells (rng as in annotate_syncytial_cell)."""
+    rng = as_random(rng)
     for _ in range(num_cells):
-        parent = random.choice(list(tree.nodes))
-        new_cell = f"Sync_{random.randint(1000, 9999)}"
+        parent = rng.choice(list(tree.nodes))
+        new_cell = f"Sync_{rng.randint(1000, 9999)}"
         tree.add_edge(parent, new_cell)
-        annotate_syncytial_cell(tree, new_cell)
+        annotate_syncytial_cell(tree, new_cell, rng)
+
+
+def _next_syncytial_number(tree):
+    """One past the largest numeric Sync_<n> suffix already in the tree."""
+    largest = 0
+    for node in tree.nodes:
+        if isinstance(node, str) and node.startswith(SYNCYTIAL_PREFIX):
+            suffix = node[len(SYNCYTIAL_PREFIX):]
+            if suffix.isdigit():
+                largest = max(largest, int(suffix))
+    return largest + 1
+
+
+def add_syncytial_cells_bulk(tree, num_cells, rng=None):
+    """
+    Insert and annotate `num_cells` syncytial cells in one pass.
+
+    As in add_random_syncytial_cells, each new cell attaches to a node
+    chosen uniformly among those present when it is inserted (including
+    earlier new cells), but all parents come from one vectorized draw.
+    New cells are numbered sequentially after the largest existing
+    Sync_<n>, so names never collide. Returns the new cell names.
+    `rng` is a NumPy Generator, random.Random or seed.
+    """
+    rng = as_generator(rng)
+
+    names = list(tree.nodes)
+    num_existing = len(names)
+    if num_existing == 0:
+        raise ValueError("Cannot attach syncytial cells to an empty tree")
+
+    # Parent of new cell i is uniform over the num_existing + i nodes before it
+    parent_index = (rng.random(num_cells) * (num_existing + np.arange(num_cells))).astype(np.int64)
+    nuclei_count = rng.integers(2, 9, size=num_cells).tolist()
+    division_time = rng.integers(20, 61, size=num_cells).tolist()
+
+    first = _next_syncytial_number(tree)
+    new_cells = [f"{SYNCYTIAL_PREFIX}{n}" for n in range(first, first + num_cells)]
+    names.extend(new_cells)
+
+    tree.add_nodes_from(
+        (cell, {"syncytial": True, "nuclei_count": nuclei, "shared_cytoplasm": True, "division_time": time})
+        for cell, nuclei, time in zip(new_cells, nuclei_count, division_time)
+    )
+    tree.add_edges_from((names[p], cell) for p, cell in zip(parent_index.tolist(), new_cells))
+    return new_cells
 
 
 if __name__ == "__main__":
@@ -66,4 +175,3 @@ if __name__ == "__main__":
     print("Nodes with division times and syncytial annotations:")
     for node, data in tree.nodes(data=True):
         print(f"{node}: {data}")
-
@@ -1,11 +1,17 @@
 import networkx as nx
 import matplotlib.pyplot as plt
-import random
-import json
+from export_utils import export_lineage_graphml, export_lineage_json
+from lineage_binary import read_lineage_binary, write_lineage_binary
+from lineage_random import as_random
 
 class C_ElegansLineage:
-    def __init__(self):
+    def __init__(self, rng=None):
+        """`rng`: random.Random, NumPy Generator or seed for all random choices (None: global random)."""
+        self.rng = as_random(rng)
         self.lineage_tree = nx.DiGraph()
+        self._depth_cache = {}
+        self._depth_signature = None
+        self._print_order = None
         self.build_initial_lineage()
     
     def build_initial_lineage(self):
@@ -22,13 +28,7 @@ class C_ElegansLineage:
         for parent, children in known_lineage.items():
             for child in children:
                 self.lineage_tree.add_edge(parent, child)
-    
-    def add_syncytial_cells(self, num_cells=5):
-        """Randomly insert syncytial cells into the lineage tree."""
-        for _ in range(num_cells):
-            parent = random.choice(list(self.lineage_tree.nodes))
-            new_cell = f"Sync_{random.randint(1, 1000)}"
-            self.lineage_tree.add_edge(parent, new_cell)
+        self.invalidate_depths()
     
     def visualize_lineage(self):
         """Display the lineage tree graphically."""
@@ -38,92 +38,109 @@ class C_ElegansLineage:
         plt.title("C. elegans Lineage Tree with Syncytial Cells")
         plt.show()
     
-    def export_lineage(self, filename="c_elegans_lineage.graphml"):
-        """Save the lineage tree in GraphML format for further analysis."""
-        nx.write_graphml(self.lineage_tree, filename)
-        print(f"Lineage tree saved as {filename}")
+    def export_lineage(self, filename="c_elegans_lineage.graphml", compress=None):
+        """Save the lineage tree in GraphML format for further analysis (streamed; gzip for .gz)."""
+        export_lineage_graphml(self.lineage_tree, filename, compress)
     
-    def export_json(self, filename="c_elegans_lineage.json"):
-        """Save the lineage tree as a JSON file."""
-        lineage_dict = nx.node_link_data(self.lineage_tree)
-        with open(filename, 'w') as f:
-            json.dump(lineage_dict, f, indent=4)
+    def export_json(self, filename="c_elegans_lineage.json", compress=None):
+        """Save the lineage tree as node-link JSON (streamed; gzip for .gz)."""
+        export_lineage_json(self.lineage_tree, filename, compress)
+
+    def export_binary(self, filename="c_elegans_lineage.lineage"):
+        """
+        Save the lineage tree in the compact binary format (a directory of
+        NumPy columns, see lineage_binary). Much faster to write and read
+        back than GraphML or JSON, and every node attribute round-trips.
+        """
+        write_lineage_binary(self.lineage_tree, filename)
         print(f"Lineage tree saved as {filename}")
+
+    def import_binary(self, filename="c_elegans_lineage.lineage"):
+        """Replace the lineage tree with one saved by export_binary."""
+        self.lineage_tree = read_lineage_binary(filename).to_networkx()
+        self.invalidate_depths()
+        return self.lineage_tree
     
+    def _tree_signature(self):
+        return self.lineage_tree.number_of_nodes(), self.lineage_tree.number_of_edges()
+
+    def invalidate_depths(self):
+        """
+        Drop cached depths. Adding cells through this class keeps the cache
+        current, and edits to lineage_tree that change its node or edge
+        count are detected; call this after any other structural edit
+        (e.g. rewiring an edge).
+        """
+        self._depth_cache = {}
+        self._depth_signature = self._tree_signature()
+        self._print_order = None
+
+    def _record_new_leaf(self, parent, child):
+        """Extend cached depths after `child` was added as a new leaf under `parent`."""
+        for depths in self._depth_cache.values():
+            if parent in depths:
+                depths[child] = depths[parent] + 1
+        self._depth_signature = self._tree_signature()
+        self._print_order = None
+
     def get_lineage_depth(self, node="Zygote"):
-        """Calculate depth of lineage tree from a given node."""
+        """
+        Calculate depth of lineage tree from a given node.
+        Results are cached per starting node; the returned dict is shared,
+        so treat it as read-only.
+        """
+        if self._depth_signature != self._tree_signature():
+            self.invalidate_depths()
+        depths = self._depth_cache.get(node)
+        if depths is None:
+            depths = self._depth_cache[node] = self._compute_depths(node)
+        return depths
+
+    def _compute_depths(self, node):
+        # Iterative preorder DFS (same visiting order as the old recursive version)
         depths = {}
-        def dfs(n, depth):
+        stack = [(node, 0)]
+        limit = self.lineage_tree.number_of_nodes()
+        while stack:
+            n, depth = stack.pop()
+            if depth > limit:
+                raise ValueError("Lineage tree contains a cycle")
             depths[n] = depth
-            for child in self.lineage_tree.successors(n):
-                dfs(child, depth + 1)
-        dfs(node, 0)
+            stack.extend((child, depth + 1) for child in reversed(list(self.lineage_tree.successors(n))))
         return depths
 
     def annotate_syncytial_cell(self, node):
         """Mark a node as syncytial with metadata."""
         self.lineage_tree.nodes[node]["syncytial"] = True
-        self.lineage_tree.nodes[node]["nuclei_count"] = random.randint(2, 8)  # Example: # of nuclei
+        self.lineage_tree.nodes[node]["nuclei_count"] = self.rng.randint(2, 8)  # Example: # of nuclei
         self.lineage_tree.nodes[node]["shared_cytoplasm"] = True
 
     def add_syncytial_cells(self, num_cells=5):
         """Randomly insert syncytial cells into the lineage tree with annotations."""
         for _ in range(num_cells):
-            parent = random.choice(list(self.lineage_tree.nodes))
-            new_cell = f"Sync_{random.randint(1, 1000)}"
+            parent = self.rng.choice(list(self.lineage_tree.nodes))
+            new_cell = f"Sync_{self.rng.randint(1, 1000)}"
+            is_new_leaf = new_cell not in self.lineage_tree
             self.lineage_tree.add_edge(parent, new_cell)
+            if is_new_leaf:
+                self._record_new_leaf(parent, new_cell)
+            else:
+                # Name collision: the existing Sync_n gains a second parent
+                # (and may close a cycle, which get_lineage_depth reports),
+                # so cached depths no longer hold
+                self.invalidate_depths()
             self.annotate_syncytial_cell(new_cell)
     
-    def generate_fate_specific_images(G, output_dir="fate_images", dpi=300):
+    def generate_fate_specific_images(self, output_dir="fate_images", dpi=300, workers=None):
         """
         Auto-generate lineage tree images, one per unique cell fate.
         Each image highlights cells of that fate, others are grayed out.
+        Rendering is done by lineage_render: one layout, one reused figure
+        per worker process.
         """
-        import os
-
-        os.makedirs(output_dir, exist_ok=True)
-
-        unique_fates = set(nx.get_node_attributes(G, "fate").values())
-
-        for fate in unique_fates:
-            pos = hierarchy_pos(G, root="Zygote")
-            node_colors = []
-            circle_nodes, square_nodes = [], []
-            circle_colors, square_colors = []
-
-           for node in G.nodes:
-               node_fate = G.nodes[node].get("fate")
-               if node_fate == fate:
-                   color = FATE_COLORS.get(fate, "lightgray")
-               else:
-                   color = "lightgray"
-
-               if G.nodes[node].get("syncytial"):
-                   square_nodes.append(node)
-                   square_colors.append(color)
-               else:
-                   circle_nodes.append(node)
-                   circle_colors.append(color)
-
-        fig = plt.figure(figsize=(14, 10))
-        ax = plt.gca()
-
-        nx.draw_networkx_edges(G, pos, edge_color='gray', ax=ax)
-        nx.draw_networkx_nodes(G, pos, nodelist=circle_nodes, node_color=circle_colors,
-                                   node_shape='o', node_size=2500, ax=ax)
-        nx.draw_networkx_nodes(G, pos, nodelist=square_nodes, node_color=square_colors,
-                                   node_shape='s', node_size=2500, ax=ax)
-        nx.draw_networkx_labels(G, pos, font_size=9, ax=ax)
-
-        plt.title(f"C. elegans Lineage — {fate.capitalize()} Cells Highlighted")
-        plt.axis('off')
-
-        plt.tight_layout()
-        filename = f"{output_dir}/lineage_fate_{fate}.png"
-        plt.savefig(filename, dpi=dpi, bbox_inches='tight')
-        plt.close()
-        print(f"✅ Saved {filename}")
+        from lineage_render import render_fate_images
 
+        return render_fate_images(self.lineage_tree, output_dir=output_dir, dpi=dpi, workers=workers)
 
     def get_syncytial_cells(self):
         """Return a list of syncytial cells in the tree."""
@@ -148,8 +165,13 @@ class C_ElegansLineage:
 
     def print_lineage(self):
         """Print lineage tree in a structured format."""
-        depths = self.get_lineage_depth()
-        for node, depth in sorted(depths.items(), key=lambda x: x[1]):
+        if self._depth_signature != self._tree_signature():
+            self.invalidate_depths()
+        if self._print_order is None:
+            # Cached depths gain new leaves at the end, so take the order from a fresh DFS
+            depths = self._compute_depths("Zygote")
+            self._print_order = sorted(depths.items(), key=lambda x: x[1])
+        for node, depth in self._print_order:
             print("  " * depth + node)
 
 if __name__ == "__main__":
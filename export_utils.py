@@ -0,0 +1,213 @@
+import gzip
+import json
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+import networkx as nx
+import numpy as np
+
+# Characters buffered before each write; keeps memory flat without tiny writes
+CHUNK_CHARS = 1 << 16
+
+# Key nx.node_link_data uses for the edge list ("links" before networkx 3.4)
+NODE_LINK_EDGES = "edges" if "edges" in nx.node_link_data(nx.DiGraph()) else "links"
+
+GRAPHML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+)
+
+
+# ==================== CHUNK GENERATORS ====================
+
+def _json_default(value):
+    """JSON fallback: NumPy values as plain numbers/lists, anything else as a string."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _buffered(pieces, chunk_chars=CHUNK_CHARS):
+    """Join small string pieces into chunks of about `chunk_chars`."""
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_chars:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def iter_json_array(items, default=_json_default):
+    """Stream a JSON array, one item per line."""
+    def pieces():
+        yield "["
+        for i, item in enumerate(items):
+            yield ("\n" if i == 0 else ",\n") + json.dumps(item, default=default)
+        yield "\n]\n"
+    return _buffered(pieces())
+
+
+def iter_node_link_json(G, default=_json_default):
+    """
+    Stream G in nx.node_link_data layout, one node or edge per line.
+    Only one node or edge is serialised at a time, so memory does not
+    grow with the tree.
+    """
+    def pieces():
+        yield '{"directed": %s, "multigraph": %s, "graph": %s, "nodes": [' % (
+            json.dumps(G.is_directed()), json.dumps(G.is_multigraph()), json.dumps(G.graph, default=default))
+        for i, (node, data) in enumerate(G.nodes(data=True)):
+            yield ("\n" if i == 0 else ",\n") + json.dumps({**data, "id": node}, default=default)
+        yield '\n], "%s": [' % NODE_LINK_EDGES
+        for i, (u, v, data) in enumerate(G.edges(data=True)):
+            yield ("\n" if i == 0 else ",\n") + json.dumps({**data, "source": u, "target": v}, default=default)
+        yield "\n]}\n"
+    return _buffered(pieces())
+
+
+def _python_type(value):
+    if isinstance(value, np.generic):
+        return type(value.item())
+    return type(value)
+
+
+def _graphml_type(types):
+    if types <= {bool}:
+        return "boolean"
+    if types <= {int}:
+        return "long"
+    if types <= {int, float}:
+        return "double"
+    return "string"
+
+
+def _graphml_keys(items, first_id):
+    """GraphML <key> ids for the attributes in `items` (one pass, only the key names are kept)."""
+    types = {}
+    for data in items:
+        for name, value in data.items():
+            types.setdefault(name, set()).add(_python_type(value))
+    return {name: (f"d{first_id + i}", _graphml_type(kinds))
+            for i, (name, kinds) in enumerate(types.items())}
+
+
+def _graphml_data(data, keys, indent):
+    return "".join(f'{indent}<data key="{keys[name][0]}">{escape(str(value))}</data>\n'
+                   for name, value in data.items())
+
+
+def iter_graphml(G):
+    """
+    Stream G as GraphML readable by nx.read_graphml. Attribute keys are
+    collected in a first pass over the nodes and edges; the elements
+    themselves are written one at a time in a second pass.
+    """
+    graph_keys = _graphml_keys([G.graph], 0)
+    node_keys = _graphml_keys((data for _, data in G.nodes(data=True)), len(graph_keys))
+    edge_keys = _graphml_keys((data for _, _, data in G.edges(data=True)), len(graph_keys) + len(node_keys))
+
+    def pieces():
+        yield GRAPHML_HEADER
+        for domain, keys in (("graph", graph_keys), ("node", node_keys), ("edge", edge_keys)):
+            for name, (key_id, kind) in keys.items():
+                yield f'  <key id="{key_id}" for="{domain}" attr.name={quoteattr(str(name))} attr.type="{kind}" />\n'
+        yield f'  <graph edgedefault="{"directed" if G.is_directed() else "undirected"}">\n'
+        for node, data in G.nodes(data=True):
+            if data:
+                yield f"    <node id={quoteattr(str(node))}>\n{_graphml_data(data, node_keys, '      ')}    </node>\n"
+            else:
+                yield f"    <node id={quoteattr(str(node))} />\n"
+        for u, v, data in G.edges(data=True):
+            head = f"    <edge source={quoteattr(str(u))} target={quoteattr(str(v))}"
+            if data:
+                yield f"{head}>\n{_graphml_data(data, edge_keys, '      ')}    </edge>\n"
+            else:
+                yield f"{head} />\n"
+        yield _graphml_data(G.graph, graph_keys, "    ")
+        yield "  </graph>\n</graphml>\n"
+    return _buffered(pieces())
+
+
+def gzip_chunks(chunks, level=6):
+    """Gzip a stream of text chunks on the fly (for HTTP responses)."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ==================== WRITERS ====================
+
+@contextmanager
+def _open_output(target, compress):
+    """Text stream for a path or an open file; gzip if compress (default: path ends in .gz)."""
+    if hasattr(target, "write"):
+        if compress:
+            with gzip.GzipFile(fileobj=target, mode="wb") as raw:
+                yield _TextWriter(raw)
+        else:
+            yield target
+        return
+    if compress is None:
+        compress = str(target).endswith(".gz")
+    if compress:
+        with gzip.open(target, "wt", encoding="utf-8") as f:
+            yield f
+    else:
+        with open(target, "w", encoding="utf-8") as f:
+            yield f
+
+
+class _TextWriter:
+    def __init__(self, raw):
+        self.raw = raw
+
+    def write(self, text):
+        return self.raw.write(text.encode("utf-8"))
+
+
+def write_chunks(chunks, target, compress=None):
+    """Write a chunk stream to a path or open file (binary if compress)."""
+    with _open_output(target, compress) as f:
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def export_lineage_json(G, filename="c_elegans_lineage.json", compress=None):
+    """Save the lineage as node-link JSON, streamed (gzip if compress or a .gz filename)."""
+    write_chunks(iter_node_link_json(G), filename, compress)
+    print(f"Lineage tree saved as {filename}")
+
+
+def export_lineage_graphml(G, filename="c_elegans_lineage.graphml", compress=None):
+    """Save the lineage as GraphML, streamed (gzip if compress or a .gz filename)."""
+    write_chunks(iter_graphml(G), filename, compress)
+    print(f"Lineage tree saved as {filename}")
+
+
+def streaming_download(chunks, filename, compress=False, mimetype="application/json"):
+    """
+    Flask response streaming `chunks` as a file download, for routes on a
+    Dash app's server. With compress, the body is gzipped on the fly and
+    the filename gains a .gz suffix.
+    """
+    from flask import Response
+
+    if compress:
+        body, filename, mimetype = gzip_chunks(chunks), f"{filename}.gz", "application/gzip"
+    else:
+        body = (chunk.encode("utf-8") for chunk in chunks)
+    return Response(body, mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="{Path(filename).name}"'})
@@ -0,0 +1,47 @@
+from lineage_random import as_random
+
+# Known fates of the founder cells
+KNOWN_FATES = {
+    "ABa": "neuron",
+    "ABp": "neuron",
+    "EMS": "gut",
+    "P2": "germline",
+    "MS": "muscle",
+    "E": "gut",
+    "C": "muscle",
+    "P3": "germline",
+    "D": "muscle",
+    "P4": "germline",
+    "Z2": "germline",
+    "Z3": "germline",
+}
+
+# Fates drawn at random for cells without a known fate
+RANDOM_FATES = ["neuron", "muscle", "gut", "progenitor"]
+
+# Fate → color map
+FATE_COLORS = {
+    "neuron": "purple",
+    "muscle": "red",
+    "skin": "tan",
+    "gut": "green",
+    "germline": "blue",
+    "progenitor": "lightblue",
+    "undifferentiated": "gray",
+    None: "lightgray"  # fallback
+}
+
+
+def assign_cell_fates(G, rng=None):
+    """
+    Set a "fate" on every cell: the known fate for founder cells,
+    "progenitor" for syncytial cells, otherwise one of RANDOM_FATES.
+    """
+    rng = as_random(rng)
+    for node in G.nodes:
+        if node in KNOWN_FATES:
+            G.nodes[node]["fate"] = KNOWN_FATES[node]
+        elif G.nodes[node].get("syncytial"):
+            G.nodes[node]["fate"] = "progenitor"
+        else:
+            G.nodes[node]["fate"] = rng.choice(RANDOM_FATES)
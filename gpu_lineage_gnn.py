@@ -5,10 +5,14 @@ from torch_geometric.data import Data
 from torch_geometric.nn import GCNConv
 
 DEVICE = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+SEED = 0  # lineage generation and model initialisation
+NUM_SYNCYTIAL = 20
+
+torch.manual_seed(SEED)
 
 # 1. Build lineage graph
 G = build_lineage_tree()  #[cite: 11]
-add_random_syncytial_cells(G, num_cells=20)  #[cite: 11]
+add_random_syncytial_cells(G, num_cells=NUM_SYNCYTIAL, rng=SEED)  #[cite: 11]
 
 node_map = {node: i for i, node in enumerate(G.nodes())}
 
@@ -0,0 +1,233 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+BINARY_VERSION = 1
+META_FILE = "meta.json"
+
+
+def _column_kind(values):
+    """Storage kind for one attribute's present values."""
+    types = {type(v) for v in values}
+    if types <= {bool, np.bool_}:
+        return "bool"
+    if types <= {int, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32}:
+        if all(-2**63 <= int(v) < 2**63 for v in values):
+            return "int"
+    if types <= {float, np.float32, np.float64}:
+        return "float"
+    if types <= {str}:
+        return "category"
+    return "json"
+
+
+def _encode_columns(items, directory, prefix):
+    """
+    Write one column per attribute for `items`, a list of attribute dicts.
+    Values go to <prefix><i>.npy, with <prefix><i>.mask.npy marking which
+    items have the attribute when some don't. Strings are stored as
+    categorical codes; anything not bool/int/float/str falls back to JSON.
+    Returns the column descriptions for meta.json.
+    """
+    keys = {}
+    for data in items:
+        for key in data:
+            keys.setdefault(key, None)
+
+    columns = []
+    for i, key in enumerate(keys):
+        present = np.fromiter((key in data for data in items), dtype=bool, count=len(items))
+        values = [data[key] for data in items if key in data]
+        kind = _column_kind(values)
+        column = {"name": key, "kind": kind, "file": f"{prefix}{i}"}
+
+        if kind == "bool":
+            array = np.array(values, dtype=bool)
+        elif kind == "int":
+            array = np.array(values, dtype=np.int64)
+        elif kind == "float":
+            array = np.array(values, dtype=np.float64)
+        elif kind == "category":
+            categories = list(dict.fromkeys(values))
+            lookup = {c: code for code, c in enumerate(categories)}
+            array = np.array([lookup[v] for v in values], dtype=np.int32)
+            column["categories"] = categories
+        else:
+            column["values"] = values
+            array = None
+
+        if array is not None:
+            np.save(directory / f"{prefix}{i}.npy", array)
+        if not present.all():
+            np.save(directory / f"{prefix}{i}.mask.npy", present)
+            column["masked"] = True
+        columns.append(column)
+    return columns
+
+
+def _forest_parents(tree, index):
+    """
+    Parent index per node (-1 for roots) if `tree` is a forest whose edge
+    order is reproduced by rebuilding from parents, else None.
+    """
+    parent = np.full(len(index), -1, dtype=np.int64)
+    edges = []
+    for u, v in tree.edges:
+        j = index[v]
+        if parent[j] >= 0:
+            return None
+        parent[j] = index[u]
+        edges.append((index[u], j))
+    children = np.flatnonzero(parent >= 0)
+    rebuilt = children[np.argsort(parent[children], kind='stable')]
+    if rebuilt.tolist() != [j for _, j in edges]:
+        return None
+    return parent
+
+
+def write_lineage_binary(tree, path):
+    """
+    Save a lineage DiGraph as a directory of .npy columns plus meta.json.
+
+    Node order, edge order, node/edge attributes and graph attributes all
+    round-trip; attribute values other than bool/int/float/str are kept
+    as JSON (so tuples come back as lists). Forests are stored as an
+    integer parent array, anything else as source/target index arrays.
+    The directory is written beside `path` and renamed into place, so
+    readers never see a partial tree; if a concurrent writer gets its
+    copy into place first, that copy is kept.
+    """
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    names = list(tree.nodes)
+    index = {name: i for i, name in enumerate(names)}
+    meta = {
+        "version": BINARY_VERSION,
+        "directed": tree.is_directed(),
+        "num_nodes": len(names),
+        "graph": dict(tree.graph),
+    }
+
+    if all(type(name) is str for name in names):
+        np.save(tmp / "names.npy", np.array(names, dtype=str))
+    else:
+        meta["names"] = names
+
+    parent = _forest_parents(tree, index)
+    if parent is not None:
+        np.save(tmp / "parent.npy", parent)
+    else:
+        edges = np.array([(index[u], index[v]) for u, v in tree.edges], dtype=np.int64).reshape(-1, 2)
+        np.save(tmp / "edges.npy", edges)
+
+    meta["node_attrs"] = _encode_columns([data for _, data in tree.nodes(data=True)], tmp, "node_attr_")
+    edge_data = [data for _, _, data in tree.edges(data=True)]
+    meta["edge_attrs"] = _encode_columns(edge_data, tmp, "edge_attr_") if any(edge_data) else []
+
+    with open(tmp / META_FILE, "w") as f:
+        json.dump(meta, f)
+
+    if path.exists():
+        shutil.rmtree(path, ignore_errors=True)
+    try:
+        os.replace(tmp, path)
+    except OSError:
+        # Another writer (e.g. a process that missed the same cache key)
+        # renamed its copy into place first; keep that one
+        if not (path / META_FILE).exists():
+            raise
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+class LineageColumns:
+    """
+    A lineage read by read_lineage_binary. Arrays are memory-mapped, so
+    opening is a few file opens; column(name) decodes one attribute
+    without touching the rest.
+    """
+
+    def __init__(self, path, mmap=True):
+        self.path = Path(path)
+        mode = "r" if mmap else None
+        with open(self.path / META_FILE) as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != BINARY_VERSION:
+            raise ValueError(f"{self.path} has unsupported version {self.meta.get('version')}")
+
+        self._mode = mode
+        if "names" in self.meta:
+            self.names = self.meta["names"]
+        else:
+            self.names = np.load(self.path / "names.npy", mmap_mode=mode).tolist()
+        if (self.path / "parent.npy").exists():
+            self.parent = np.load(self.path / "parent.npy", mmap_mode=mode)
+            self.edges = None
+        else:
+            self.parent = None
+            self.edges = np.load(self.path / "edges.npy", mmap_mode=mode)
+
+    def __len__(self):
+        return self.meta["num_nodes"]
+
+    def edge_index(self):
+        """(m, 2) array of (source, target) node indexes in edge order."""
+        if self.edges is not None:
+            return np.asarray(self.edges)
+        children = np.flatnonzero(self.parent >= 0)
+        children = children[np.argsort(self.parent[children], kind='stable')]
+        return np.column_stack([self.parent[children], children])
+
+    def _decode(self, column, count):
+        """(values, present) for one column description; values cover present items only."""
+        if column["kind"] == "json":
+            values = column["values"]
+        else:
+            values = np.load(self.path / f"{column['file']}.npy", mmap_mode=self._mode)
+            if column["kind"] == "category":
+                values = np.asarray(column["categories"], dtype=object)[values] if len(values) else []
+        if column.get("masked"):
+            present = np.load(self.path / f"{column['file']}.mask.npy", mmap_mode=self._mode)
+        else:
+            present = np.ones(count, dtype=bool)
+        return values, present
+
+    def column(self, name):
+        """(values, present) for node attribute `name`; values align with nodes where present."""
+        for column in self.meta["node_attrs"]:
+            if column["name"] == name:
+                return self._decode(column, len(self))
+        raise KeyError(name)
+
+    def _attr_dicts(self, columns, count):
+        items = [{} for _ in range(count)]
+        for column in columns:
+            values, present = self._decode(column, count)
+            values = values.tolist() if isinstance(values, np.ndarray) else list(values)
+            for i, value in zip(np.flatnonzero(present).tolist(), values):
+                items[i][column["name"]] = value
+        return items
+
+    def to_networkx(self):
+        names = self.names
+        node_attrs = self._attr_dicts(self.meta["node_attrs"], len(names))
+        edges = self.edge_index().tolist()
+        edge_attrs = self._attr_dicts(self.meta["edge_attrs"], len(edges))
+
+        tree = nx.DiGraph() if self.meta["directed"] else nx.Graph()
+        tree.add_nodes_from(zip(names, node_attrs))
+        tree.add_edges_from((names[u], names[v], data) for (u, v), data in zip(edges, edge_attrs))
+        tree.graph.update(self.meta["graph"])
+        return tree
+
+
+def read_lineage_binary(path, mmap=True):
+    """Open a directory written by write_lineage_binary."""
+    return LineageColumns(path, mmap=mmap)
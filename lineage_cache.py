@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+CACHE_DIR = "lineage_cache"
+CACHE_MAX_BYTES = 256 * 1024 ** 2
+CACHE_VERSION = 1
+
+# lineage_binary (NumPy, networkx) is imported where it is used, so importing
+# this module, e.g. for CACHE_DIR or cache_key, stays cheap
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(params, sources=()):
+    """
+    Hash of the builder parameters (a JSON-serialisable dict, including the
+    seed and any inline source data such as KNOWN_LINEAGE) and the contents
+    of any source files the build reads.
+    """
+    payload = {
+        "version": CACHE_VERSION,
+        "params": params,
+        "sources": [_file_digest(path) for path in sources],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def _entry_size(path):
+    return sum(f.stat().st_size for f in path.iterdir())
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, keep=()):
+    """Delete least recently used entries until the cache fits in `max_bytes`."""
+    from lineage_binary import META_FILE
+
+    cache_dir = Path(cache_dir)
+    if not cache_dir.exists():
+        return
+    entries = []
+    for path in cache_dir.iterdir():
+        meta = path / META_FILE
+        if path.is_dir() and meta.exists():
+            entries.append((meta.stat().st_mtime, path, _entry_size(path)))
+    total = sum(size for _, _, size in entries)
+    for _, path, size in sorted(entries, key=lambda entry: entry[0]):
+        if total <= max_bytes:
+            break
+        if path.name in keep:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+def load_cached(key, cache_dir=CACHE_DIR):
+    """Memory-mapped LineageColumns for `key`, or None on a miss. Marks the entry as used."""
+    from lineage_binary import META_FILE, read_lineage_binary
+
+    path = Path(cache_dir) / key
+    meta = path / META_FILE
+    if not meta.exists():
+        return None
+    try:
+        os.utime(meta)
+        return read_lineage_binary(path)
+    except (OSError, ValueError):
+        # Evicted by another process mid-read, or written by an older version
+        return None
+
+
+def store(key, tree, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """Write `tree` under `key`, then evict old entries over the size cap."""
+    from lineage_binary import write_lineage_binary
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    write_lineage_binary(tree, cache_dir / key)
+    evict(cache_dir, max_bytes, keep={key})
+
+
+def cached_columns(params, build, sources=(), cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+    """
+    The lineage for `params` as memory-mapped LineageColumns: names,
+    parent array and per-attribute columns, read without building a
+    networkx graph (e.g. for LineageIndex.from_parents or column("fate")).
+    On a miss the tree is built with build(), stored and reopened. Only
+    cache deterministic builds, i.e. ones whose params include a seed.
+
+    There is deliberately no networkx variant: rebuilding a DiGraph from
+    the columns costs about as much as the builders in this repo, so
+    callers that need a graph should just build it.
+    """
+    from lineage_binary import read_lineage_binary
+
+    key = cache_key(params, sources)
+    cached = load_cached(key, cache_dir)
+    if cached is not None:
+        return cached
+    store(key, build(), cache_dir, max_bytes)
+    return read_lineage_binary(Path(cache_dir) / key)
@@ -1,12 +1,77 @@
 import argparse
-from build_initial_lineage import build_lineage_tree, add_random_syncytial_cells
-from fate_utils import assign_cell_fates
-from lineage_visualizer import visualize_lineage_tree
-from export_utils import export_lineage_graphml, export_lineage_json
-from animate_lineage import animate_lineage_by_time
+import sys
 
-def main():
+# Heavy modules (networkx, NumPy, matplotlib) are imported inside the
+# functions that need them, so `--help` and `export` start fast
+
+NUM_SYNCYTIAL = 10
+
+
+def build_annotated_lineage(seed=None):
+    """Build the lineage, insert syncytial cells and assign fates."""
+    from build_initial_lineage import add_random_syncytial_cells, build_lineage_tree
+    from fate_utils import assign_cell_fates
+    from lineage_random import as_random
+
+    rng = as_random(seed)
+    lineage_tree = build_lineage_tree()
+    add_random_syncytial_cells(lineage_tree, num_cells=NUM_SYNCYTIAL, rng=rng)
+    assign_cell_fates(lineage_tree, rng)
+    return lineage_tree
+
+
+def lineage_from_args(args, seed=None):
+    """build_annotated_lineage for --seed, or for `seed` if given."""
+    return build_annotated_lineage(args.seed if seed is None else seed)
+
+
+# ==================== SUBCOMMANDS ====================
+
+def run_visualize(args):
+    from visualize_lineage_tree import visualize_lineage_tree
+
+    lineage_tree = lineage_from_args(args)
+    visualize_lineage_tree(lineage_tree, color_by_fate=args.fate, save_path=args.save, show=args.show)
+
+
+def run_export(args):
+    from export_utils import export_lineage_graphml, export_lineage_json
+
+    lineage_tree = lineage_from_args(args)
+    if args.format == "graphml":
+        export_lineage_graphml(lineage_tree, filename=args.output)
+    elif args.format == "json":
+        export_lineage_json(lineage_tree, filename=args.output)
+
+
+def run_animate(args):
+    from animate_lineage import animate_lineage_by_time
+
+    lineage_tree = lineage_from_args(args)
+    animate_lineage_by_time(lineage_tree, output_gif=args.output, frame_duration=args.speed)
+
+
+def run_pipeline_command(args):
+    """Build the lineage once (seed from the manifest or --seed) and run every manifest output."""
+    from lineage_pipeline import load_manifest, run_pipeline
+
+    try:
+        manifest = load_manifest(args.manifest)
+    except (OSError, ValueError, ImportError) as e:
+        sys.exit(f"❌ {e}")
+    lineage_tree = lineage_from_args(args, seed=manifest.get("seed"))
+    workers = args.workers if args.workers is not None else manifest.get("workers")
+    results = run_pipeline(lineage_tree, manifest["outputs"], workers=workers)
+    failed = sum(error is not None for _, _, _, error in results)
+    if failed:
+        print(f"❌ {failed} of {len(results)} outputs failed")
+        sys.exit(1)
+    print(f"✅ {len(results)} outputs written")
+
+
+def build_parser():
     parser = argparse.ArgumentParser(description="🧬 C. elegans Lineage CLI Tool")
+    parser.add_argument('--seed', type=int, help="Seed for syncytial cells and fates")
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     # Visualize Command
@@ -14,38 +79,34 @@ def main():
     vis_parser.add_argument('--fate', action='store_true', help="Color by cell fate")
     vis_parser.add_argument('--save', type=str, help="Path to save image (e.g., tree.png)")
     vis_parser.add_argument('--show', action='store_true', help="Display the plot")
+    vis_parser.set_defaults(func=run_visualize)
 
     # Export Command
     export_parser = subparsers.add_parser('export', help="Export the lineage tree")
     export_parser.add_argument('--format', choices=['graphml', 'json'], required=True)
     export_parser.add_argument('--output', type=str, required=True, help="Output filename")
+    export_parser.set_defaults(func=run_export)
 
     # Animate Command
     anim_parser = subparsers.add_parser('animate', help="Animate lineage by division time")
     anim_parser.add_argument('--output', type=str, default="lineage.gif", help="Output GIF filename")
     anim_parser.add_argument('--speed', type=float, default=0.8, help="Frame duration in seconds")
+    anim_parser.set_defaults(func=run_animate)
 
-    args = parser.parse_args()
+    # Pipeline Command
+    pipe_parser = subparsers.add_parser('pipeline', help="Build the lineage once and write every output in a manifest")
+    pipe_parser.add_argument('manifest', type=str, help="JSON or YAML manifest listing the outputs")
+    pipe_parser.add_argument('--workers', type=int, help="Worker processes (default: manifest, else one per CPU)")
+    pipe_parser.set_defaults(func=run_pipeline_command)
 
-    # Build and annotate lineage
-    lineage_tree = build_lineage_tree()
-    add_random_syncytial_cells(lineage_tree, num_cells=10)
-    assign_cell_fates(lineage_tree)
-
-    # Handle commands
-    if args.command == "visualize":
-        visualize_lineage_tree(lineage_tree, color_by_fate=args.fate, save_path=args.save, show=args.show)
+    return parser
 
-    elif args.command == "export":
-        if args.format == "graphml":
-            export_lineage_graphml(lineage_tree, filename=args.output)
-        elif args.format == "json":
-            export_lineage_json(lineage_tree, filename=args.output)
 
-    elif args.command == "animate":
-        animate_lineage_by_time(lineage_tree, output_gif=args.output, frame_duration=args.speed)
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    # Each subcommand builds (or loads) the annotated lineage itself
+    args.func(args)
 
 
 if __name__ == "__main__":
     main()
-
@@ -1,46 +1,31 @@
-import json
+from urllib.parse import urlencode
+
 import dash
 import dash_cytoscape as cyto
 import networkx as nx
-from dash import Input, Output, State, dcc, html
+from dash import Input, Output, dcc, html
 from dash.exceptions import PreventUpdate
+from flask import request
 
 from build_initial_lineage import add_random_syncytial_cells, build_lineage_tree
+from export_utils import iter_json_array, streaming_download
+from fate_utils import assign_cell_fates
+from lineage_random import as_random
 
-import random
-
-# Inline fate assigner fallback
-KNOWN_FATES = {
-    "ABa": "neuron",
-    "ABp": "neuron",
-    "EMS": "gut",
-    "P2": "germline",
-    "MS": "muscle",
-    "E": "gut",
-    "C": "muscle",
-    "P3": "germline",
-    "D": "muscle",
-    "P4": "germline",
-    "Z2": "germline",
-    "Z3": "germline",
-}
-
-
-def assign_cell_fates(G):
-  for node in G.nodes:
-    if node in KNOWN_FATES:
-      G.nodes[node]["fate"] = KNOWN_FATES[node]
-    elif G.nodes[node].get("syncytial"):
-      G.nodes[node]["fate"] = "progenitor"
-    else:
-      G.nodes[node]["fate"] = random.choice(
-          ["neuron", "muscle", "gut", "progenitor"]
-      )
+# Seed for the generated lineage (None: a different tree on every start)
+SEED = None
+NUM_SYNCYTIAL = 10
 
 # Initialize lineage graph
-G = build_lineage_tree()  #[cite: 16]
-add_random_syncytial_cells(G, num_cells=10)  #[cite: 16]
-assign_cell_fates(G)  #[cite: 16]
+def build_annotated_lineage():
+  rng = as_random(SEED)
+  G = build_lineage_tree()  #[cite: 16]
+  add_random_syncytial_cells(G, num_cells=NUM_SYNCYTIAL, rng=rng)  #[cite: 16]
+  assign_cell_fates(G, rng)  #[cite: 16]
+  return G
+
+
+G = build_annotated_lineage()
 
 # Fate → color map
 FATE_COLORS = {
@@ -55,9 +40,8 @@ FATE_COLORS = {
 }  #[cite: 16]
 
 
-# Convert NetworkX → Cytoscape format
-def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None):
-  elements = []
+# Convert NetworkX → Cytoscape format (one element at a time)
+def iter_cytoscape_elements(G, time_cutoff=None, fate_filter=None):
   for node in G.nodes:
     div_time = G.nodes[node].get("division_time", 999)
     if time_cutoff is not None and div_time > time_cutoff:
@@ -71,7 +55,7 @@ def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None):
     shape = "rectangle" if sync else "ellipse"
     color = FATE_COLORS.get(fate, "lightgray")
 
-    elements.append({
+    yield {
         "data": {"id": node, "label": node},
         "classes": fate,
         "style": {
@@ -79,7 +63,7 @@ def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None):
             "background-color": color,
             "label": node,
         },
-    })
+    }
 
   for source, target in G.edges:
     stime = G.nodes[source].get("division_time", 999)
@@ -90,9 +74,11 @@ def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None):
       continue
     if fate_filter and (G.nodes[target].get("fate") != fate_filter):
       continue
-    elements.append({"data": {"source": source, "target": target}})
+    yield {"data": {"source": source, "target": target}}
 
-  return elements  #[cite: 16]
+
+def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None):
+  return list(iter_cytoscape_elements(G, time_cutoff, fate_filter))  #[cite: 16]
 
 
 # Initialize Dash app
@@ -165,8 +151,12 @@ app.layout = html.Div([
     html.Hr(),
     html.Div(
         [
-            html.Button("⬇️ Download JSON", id="btn-download-json"),
-            dcc.Download(id="download-json"),  # Replaced legacy Download component
+            # Served by the streaming /download route below
+            html.A(
+                html.Button("⬇️ Download JSON"),
+                id="download-json-link",
+                href="/download/lineage_visible.json",
+            ),
             html.Br(),
             html.Br(),
             html.Button("📷 Download PNG", id="btn-download-png", n_clicks=0),
@@ -242,20 +232,31 @@ def display_click_metadata(node_data):
   ])  #[cite: 16]
 
 
-# Download JSON using native dcc.Download
+# Download JSON: the link carries the current filters, and the server
+# streams the elements so large lineages never sit in memory as one string
 @app.callback(
-    Output("download-json", "data"),
-    Input("btn-download-json", "n_clicks"),  # Only button click triggers
-    State("time-slider", "value"),  # Read value without triggering
-    State("fate-filter", "value"),  # Read value without triggering
-    prevent_initial_call=True,
+    Output("download-json-link", "href"),
+    Input("time-slider", "value"),
+    Input("fate-filter", "value"),
 )
-def download_json(n_clicks, time_value, selected_fate):
-  elements = nx_to_cytoscape(
-      G, time_cutoff=time_value, fate_filter=selected_fate
+def update_download_link(time_value, selected_fate):
+  query = {"time": time_value, "fate": selected_fate}
+  return "/download/lineage_visible.json?" + urlencode(
+      {key: value for key, value in query.items() if value is not None}
+  )
+
+
+@app.server.route("/download/lineage_visible.json")
+def download_json():
+  elements = iter_cytoscape_elements(
+      G,
+      time_cutoff=request.args.get("time", type=float),
+      fate_filter=request.args.get("fate") or None,
   )
-  return dict(
-      content=json.dumps(elements, indent=2), filename="lineage_visible.json"
+  return streaming_download(
+      iter_json_array(elements),
+      "lineage_visible.json",
+      compress=request.args.get("gzip") == "1",
   )
 
 # Client-side PNG export
@@ -1,4 +1,3 @@
-import json
 import base64
 import io
 import dash
@@ -9,8 +8,9 @@ from dash.exceptions import PreventUpdate
 import networkx as nx
 import pandas as pd
 import numpy as np
-from dash_extensions import Download
-from dash_extensions.snippets import send_string
+from flask import request
+
+from export_utils import iter_node_link_json, streaming_download
 
 # Sample lineage tree
 G = nx.DiGraph()
@@ -121,8 +121,7 @@ app.layout = html.Div([
         style={"width": "100%", "height": "600px"},
     ),
     html.Div([
-        html.Button("⬇️ Download JSON", id="btn-download-json"),
-        Download(id="download-json"),
+        html.A(html.Button("⬇️ Download JSON"), href="/download/lineage.json"),
         html.Br(), html.Br(),
         html.Button("📷 Download PNG", id="btn-download-png", n_clicks=0),
         dcc.Store(id="trigger-png"),
@@ -195,14 +194,11 @@ def update_theme(theme):
             {"selector": "core", "style": {"background-color": "#fff"}}
         ]
 
-@app.callback(
-    Output("download-json", "data"),
-    Input("btn-download-json", "n_clicks"),
-    prevent_initial_call=True
-)
-def download_json(n):
-    lineage_json = nx.node_link_data(G)
-    return send_string(json.dumps(lineage_json, indent=2), "lineage.json")
+@app.server.route("/download/lineage.json")
+def download_json():
+    # Node-link JSON streamed node by node (?gzip=1 compresses on the fly)
+    return streaming_download(iter_node_link_json(G), "lineage.json",
+                              compress=request.args.get("gzip") == "1")
 
 app.clientside_callback(
     """
@@ -3,12 +3,12 @@ from dash import html, dcc, Input, Output
 import dash_cytoscape as cyto
 import networkx as nx
 import pandas as pd
-import json
-from dash_extensions import Download
-from dash_extensions.snippets import send_string
+from flask import request
+from urllib.parse import urlencode
 
 from build_initial_lineage import build_lineage_tree, add_random_syncytial_cells
 from fate_utils import assign_cell_fates
+from export_utils import iter_json_array, streaming_download
 
 # Expression data
 expression_df = pd.DataFrame([
@@ -47,8 +47,7 @@ for _, row in expression_df.iterrows():
     if row["cell"] in G.nodes:
         G.nodes[row["cell"]]["expression"] = row.drop("cell").to_dict()
 
-def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None, gene=None):
-    elements = []
+def iter_cytoscape_elements(G, time_cutoff=None, fate_filter=None, gene=None):
     for node in G.nodes:
         div_time = G.nodes[node].get("division_time", 999)
         if time_cutoff is not None and div_time > time_cutoff:
@@ -66,10 +65,10 @@ def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None, gene=None):
             fate = G.nodes[node].get("fate", "unknown")
             color = FATE_COLORS.get(fate, "lightgray")
 
-        elements.append({
+        yield {
             'data': {'id': node, 'label': node},
             'style': {'shape': shape, 'background-color': color, 'label': node}
-        })
+        }
 
     for source, target in G.edges:
         if time_cutoff:
@@ -77,8 +76,10 @@ def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None, gene=None):
                 continue
             if G.nodes[target].get("division_time", 999) > time_cutoff:
                 continue
-        elements.append({'data': {'source': source, 'target': target}})
-    return elements
+        yield {'data': {'source': source, 'target': target}}
+
+def nx_to_cytoscape(G, time_cutoff=None, fate_filter=None, gene=None):
+    return list(iter_cytoscape_elements(G, time_cutoff, fate_filter, gene))
 
 app = dash.Dash(__name__)
 app.title = "🧬 Lineage Tree with Gene Expression"
@@ -128,8 +129,7 @@ app.layout = html.Div([
     ),
 
     html.Div(id="hover-tooltip", style={"marginTop": "10px", "fontSize": "16px"}),
-    html.Button("⬇️ Download JSON", id="btn-download-json"),
-    Download(id="download-json")
+    html.A(html.Button("⬇️ Download JSON"), id="download-json-link", href="/download/lineage_visible.json")
 ])
 
 @app.callback(
@@ -164,15 +164,21 @@ def toggle_legend(gene):
     return {'display': 'none'}
 
 @app.callback(
-    Output("download-json", "data"),
-    Input("btn-download-json", "n_clicks"),
+    Output("download-json-link", "href"),
     Input("time-slider", "value"),
-    Input("gene-selector", "value"),
-    prevent_initial_call=True
+    Input("gene-selector", "value")
 )
-def download_json(n_clicks, time_val, gene_val):
-    elements = nx_to_cytoscape(G, time_cutoff=time_val, gene=gene_val)
-    return send_string(json.dumps(elements, indent=2), filename="lineage_visible.json")
+def update_download_link(time_val, gene_val):
+    query = {k: v for k, v in {"time": time_val, "gene": gene_val}.items() if v is not None}
+    return "/download/lineage_visible.json?" + urlencode(query)
+
+@app.server.route("/download/lineage_visible.json")
+def download_json():
+    # Streamed element by element rather than built as one JSON string
+    elements = iter_cytoscape_elements(G, time_cutoff=request.args.get("time", type=float),
+                                       gene=request.args.get("gene") or None)
+    return streaming_download(iter_json_array(elements), "lineage_visible.json",
+                              compress=request.args.get("gzip") == "1")
 
 if __name__ == "__main__":
     app.run_server(debug=True)
@@ -0,0 +1,28 @@
+import hashlib
+import json
+
+import numpy as np
+
+
+def _plain(value):
+    """JSON fallback for NumPy scalars and arrays stored as node attributes."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Cannot fingerprint attribute value of type {type(value).__name__}")
+
+
+def tree_fingerprint(tree):
+    """
+    SHA-256 of a lineage tree's content: its nodes with their attributes
+    and its edges, independent of insertion order. Two trees with the
+    same fingerprint are interchangeable, e.g. two seeded builds that
+    should agree. Cached trees are keyed by build parameters instead
+    (see lineage_cache), since a fingerprint needs the built tree.
+    """
+    nodes = sorted((str(node), json.dumps(data, sort_keys=True, default=_plain))
+                   for node, data in tree.nodes(data=True))
+    edges = sorted((str(u), str(v)) for u, v in tree.edges)
+    payload = json.dumps({"nodes": nodes, "edges": edges}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
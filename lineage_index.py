@@ -0,0 +1,160 @@
+import numpy as np
+
+from lineage_store import _csr, _preorder
+
+
+class LineageIndex:
+    """
+    Static ancestry index over a lineage tree (or forest).
+
+    A single iterative DFS assigns every cell its Euler-tour entry time
+    (its preorder position) and exit time (the last preorder position in
+    its subtree), so:
+      - is_ancestor(a, b) is two comparisons,
+      - subtree(a) is a slice of the preorder,
+      - lca(a, b) is one range-minimum query over preorder depths,
+        answered in O(1) from a sparse table.
+
+    For LCA the table is built over the n-entry preorder rather than the
+    2n-1 entry Euler sequence: for tin[a] < tin[b] with a not an
+    ancestor of b, the LCA is the parent of the shallowest cell at
+    preorder positions tin[a]+1 .. tin[b].
+
+    Batch methods take NumPy arrays of cell indexes (or names) and
+    return arrays; -1 stands for "no such cell" (e.g. the LCA of cells
+    in different trees).
+    """
+
+    def __init__(self, names, parent):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.parent = np.asarray(parent, dtype=np.int64)
+        n = len(self.names)
+        if self.parent.shape != (n,):
+            raise ValueError("Need one parent entry per cell")
+
+        offsets, child_index = _csr(self.parent, n)
+        offsets, child_index = offsets.tolist(), child_index.tolist()
+        parent_list = self.parent.tolist()
+
+        # Iterative preorder DFS from every root
+        order = _preorder(parent_list, offsets, child_index)
+
+        size = [1] * n
+        depth = [0] * n
+        for v in order:
+            p = parent_list[v]
+            if p >= 0:
+                depth[v] = depth[p] + 1
+        for v in reversed(order):
+            p = parent_list[v]
+            if p >= 0:
+                size[p] += size[v]
+
+        self.order = np.asarray(order, dtype=np.int64)
+        self.depth = np.asarray(depth, dtype=np.int32)
+        self.tin = np.empty(n, dtype=np.int64)
+        self.tin[self.order] = np.arange(n)
+        self.tout = self.tin + np.asarray(size, dtype=np.int64) - 1
+
+        self._build_sparse_table()
+
+    def _build_sparse_table(self):
+        # table[k, i]: preorder position of the shallowest cell in [i, i + 2**k)
+        n = len(self.names)
+        order_depth = self.depth[self.order]
+        levels = max(1, int(n).bit_length())
+        table = np.zeros((levels, max(n, 1)), dtype=np.int32)
+        table[0, :n] = np.arange(n)
+        for k in range(1, levels):
+            half = 1 << (k - 1)
+            span = n - (1 << k) + 1
+            if span <= 0:
+                break
+            a = table[k - 1, :span]
+            b = table[k - 1, half:half + span]
+            table[k, :span] = np.where(order_depth[a] <= order_depth[b], a, b)
+        self._table = table
+        self._order_depth = order_depth
+
+    # ==================== CONSTRUCTORS ====================
+
+    @classmethod
+    def from_parents(cls, lineage):
+        """Build from anything with names and parent arrays (LineageArrays, LineageStore)."""
+        return cls(lineage.names, lineage.parent)
+
+    @classmethod
+    def from_graph(cls, tree):
+        """Build from a DiGraph such as build_lineage_tree() or C_ElegansLineage.lineage_tree."""
+        names = list(tree.nodes)
+        index = {name: i for i, name in enumerate(names)}
+        parent = np.full(len(names), -1, dtype=np.int64)
+        for u, v in tree.edges:
+            if parent[index[v]] >= 0:
+                raise ValueError(f"{v!r} has more than one parent; lineage must be a tree")
+            parent[index[v]] = index[u]
+        return cls(names, parent)
+
+    # ==================== QUERIES ====================
+
+    def __len__(self):
+        return len(self.names)
+
+    def indices(self, cells):
+        """Convert an array of names (or indexes, returned as-is) to indexes."""
+        cells = np.asarray(cells)
+        if cells.dtype.kind in "iu":
+            return cells.astype(np.int64, copy=False)
+        flat = np.fromiter((self.index[c] for c in cells.ravel().tolist()), dtype=np.int64, count=cells.size)
+        return flat.reshape(cells.shape)
+
+    def is_ancestor(self, ancestor, descendant):
+        """True if `descendant` is in the subtree of `ancestor` (a cell is its own ancestor)."""
+        a, b = self.index[ancestor], self.index[descendant]
+        return bool(self.tin[a] <= self.tin[b] <= self.tout[a])
+
+    def is_ancestor_batch(self, pairs):
+        """Vectorized is_ancestor over an (m, 2) array of (ancestor, descendant) pairs."""
+        pairs = self.indices(pairs)
+        a, b = pairs[:, 0], pairs[:, 1]
+        return (self.tin[a] <= self.tin[b]) & (self.tin[b] <= self.tout[a])
+
+    def lca_batch(self, pairs):
+        """Lowest common ancestor index for each row of an (m, 2) array (-1 if none)."""
+        pairs = self.indices(pairs)
+        a, b = pairs[:, 0], pairs[:, 1]
+        ta, tb = self.tin[a], self.tin[b]
+        lo = np.minimum(ta, tb)
+        hi = np.maximum(ta, tb)
+
+        result = np.where(ta <= tb, a, b)
+        nested = hi <= self.tout[result]
+        query = ~nested
+        if query.any():
+            left = lo[query] + 1
+            right = hi[query]
+            k = np.log2(right - left + 1).astype(np.int64)
+            first = self._table[k, left]
+            second = self._table[k, right - (1 << k) + 1]
+            depth = self._order_depth
+            shallowest = np.where(depth[first] <= depth[second], first, second)
+            result[query] = self.parent[self.order[shallowest]]
+        return result
+
+    def lca(self, a, b):
+        """Name of the lowest common ancestor of `a` and `b`, or None if unrelated."""
+        i = self.lca_batch(np.array([[self.index[a], self.index[b]]]))[0]
+        return self.names[i] if i >= 0 else None
+
+    def subtree_index(self, cell):
+        """Indexes of `cell` and its descendants in preorder (a view, O(1))."""
+        i = self.index[cell]
+        return self.order[self.tin[i]:self.tout[i] + 1]
+
+    def subtree(self, cell):
+        return [self.names[i] for i in self.subtree_index(cell).tolist()]
+
+    def subtree_size(self, cell):
+        i = self.index[cell]
+        return int(self.tout[i] - self.tin[i] + 1)
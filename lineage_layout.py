@@ -0,0 +1,171 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+LAYOUT_CACHE_SIZE = 32
+
+_layout_cache = OrderedDict()
+
+
+class TreeLayout:
+    """
+    Node coordinates of a tree layout: nodes[i] is drawn at xy[i].
+    Nodes are in preorder from the root; cells not reachable from the
+    root are not placed.
+    """
+
+    def __init__(self, nodes, xy, parent, depth):
+        self.nodes = nodes
+        self.xy = xy
+        self.parent = parent
+        self.depth = depth
+        self._index = None
+
+    @property
+    def index(self):
+        """{node: position in nodes}, built on first use."""
+        if self._index is None:
+            self._index = {node: i for i, node in enumerate(self.nodes)}
+        return self._index
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def as_dict(self):
+        """{node: (x, y)}, the pos format networkx drawing functions take."""
+        return dict(zip(self.nodes, map(tuple, self.xy.tolist())))
+
+    def edge_segments(self):
+        """(m, 2, 2) array of parent→child line segments, for a LineCollection."""
+        children = np.flatnonzero(self.parent >= 0)
+        return np.stack([self.xy[self.parent[children]], self.xy[children]], axis=1)
+
+
+def tree_layout(G, root="Zygote", width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5, weighted=False):
+    """
+    Hierarchical layout of the tree under `root`, computed iteratively in
+    O(n) with no recursion, so deep lineages do not hit the stack limit.
+
+    By default every child gets an equal share of its parent's width, as
+    hierarchy_pos always did. With weighted=True each child's share is
+    proportional to the number of leaves under it (the leaf-count sizing
+    used by Reingold–Tilford style layouts), so large subtrees get room
+    and leaves are evenly spaced across the full width.
+    """
+    nodes = [root]
+    parent = [-1]
+    depth = [0]
+    children = []
+    succ = G.succ
+    limit = G.number_of_nodes()
+    # Preorder walk that numbers nodes as they are discovered and records
+    # each node's children as an index range
+    stack = [0]
+    first = 1
+    while stack:
+        i = stack.pop()
+        kids = succ[nodes[i]]
+        if not kids:
+            children.append((i, first, first))
+            continue
+        count = len(kids)
+        last = first + count
+        if last > limit:
+            raise ValueError(f"Graph under {root!r} is not a tree")
+        nodes.extend(kids)
+        parent.extend([i] * count)
+        depth.extend([depth[i] + 1] * count)
+        children.append((i, first, last))
+        stack.extend(range(last - 1, first - 1, -1))
+        first = last
+
+    n = len(nodes)
+    if weighted:
+        share = [0.0] * n
+        for i, first, last in children:
+            if first == last:
+                share[i] = 1.0
+        # Children are numbered after their parent, so a reverse sweep sums leaves
+        for i in range(n - 1, 0, -1):
+            share[parent[i]] += share[i]
+        share = np.asarray(share)
+    else:
+        share = np.ones(n)
+
+    # Each child's fraction of its parent's width, and the fraction taken
+    # by the siblings before it (siblings are numbered consecutively)
+    entries = np.asarray(children, dtype=np.int64).reshape(-1, 3)
+    first_child = np.zeros(n, dtype=np.int64)
+    first_child[entries[:, 0]] = entries[:, 1]
+    parent_index = np.asarray(parent[1:], dtype=np.int64)
+    total = np.bincount(parent_index, weights=share[1:], minlength=n)
+    before = np.concatenate(([0.0], np.cumsum(share)))
+    frac = np.zeros(n)
+    offset = np.zeros(n)
+    frac[1:] = share[1:] / total[parent_index]
+    offset[1:] = (before[1:n] - before[first_child[parent_index]]) / total[parent_index] + frac[1:] / 2
+
+    span = [0.0] * n
+    center = [0.0] * n
+    span[0], center[0] = float(width), float(xcenter)
+    frac, offset = frac.tolist(), offset.tolist()
+    for i in range(1, n):
+        p = parent[i]
+        s = span[p]
+        span[i] = s * frac[i]
+        center[i] = center[p] - s / 2 + s * offset[i]
+
+    parent = np.asarray(parent, dtype=np.int64)
+    depth = np.asarray(depth, dtype=np.int64)
+    xy = np.column_stack([center, vert_loc - depth * vert_gap])
+
+    # Renumber from discovery order to preorder
+    order = np.fromiter((i for i, _, _ in children), dtype=np.int64, count=n)
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+    parent = np.where(parent[order] >= 0, rank[parent[order]], -1)
+    return TreeLayout([nodes[i] for i in order.tolist()], xy[order], parent, depth[order])
+
+
+def hierarchy_pos(G, root="Zygote", width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5, pos=None, parent=None):
+    """
+    Compute a hierarchical layout for a directed tree as {node: (x, y)}.
+    Same coordinates as the old recursive version, computed iteratively;
+    `pos`, if given, is updated and returned. (`parent` is unused and
+    kept for compatibility.)
+    """
+    layout = tree_layout(G, root, width, vert_gap, vert_loc, xcenter).as_dict()
+    if pos is None:
+        return layout
+    pos.update(layout)
+    return pos
+
+
+def layout_key(G, root="Zygote", **params):
+    """
+    Hash of the tree structure the layout depends on: edges in adjacency
+    order (child order matters), the root and the layout parameters.
+    """
+    digest = hashlib.sha256(repr((root, sorted(params.items()))).encode())
+    for u, v in G.edges:
+        digest.update(f"{u!r}\0{v!r}\n".encode())
+    return digest.hexdigest()
+
+
+def cached_tree_layout(G, root="Zygote", fingerprint=None, **params):
+    """
+    tree_layout, memoised for the last LAYOUT_CACHE_SIZE trees. Pass a
+    `fingerprint` already known to identify the structure (e.g. a lineage
+    cache key) to skip hashing the edges.
+    """
+    key = fingerprint if fingerprint is not None else layout_key(G, root, **params)
+    key = (key, root, tuple(sorted(params.items())))
+    layout = _layout_cache.get(key)
+    if layout is None:
+        layout = _layout_cache[key] = tree_layout(G, root, **params)
+        if len(_layout_cache) > LAYOUT_CACHE_SIZE:
+            _layout_cache.popitem(last=False)
+    else:
+        _layout_cache.move_to_end(key)
+    return layout
@@ -0,0 +1,185 @@
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Lineage shared by the jobs of one worker process (or the serial run), set by _init_worker
+_tree = None
+
+
+# ==================== JOBS ====================
+# Each job takes the annotated lineage plus the options of its manifest
+# entry, imports what it needs and returns the paths it wrote.
+
+def export_job(tree, output, format=None, compress=None):
+    from export_utils import export_lineage_graphml, export_lineage_json
+
+    if format is None:
+        format = "json" if ".json" in Path(output).suffixes else "graphml"
+    if format == "graphml":
+        export_lineage_graphml(tree, filename=output, compress=compress)
+    elif format == "json":
+        export_lineage_json(tree, filename=output, compress=compress)
+    else:
+        raise ValueError(f"Unknown export format {format!r}")
+    return [output]
+
+
+def visualize_job(tree, output, fate=True, dpi=300, fast=None, label_depth=None):
+    from visualize_lineage_tree import visualize_lineage_tree
+
+    visualize_lineage_tree(tree, color_by_fate=fate, save_path=output, dpi=dpi, show=False,
+                           fast=fast, label_depth=label_depth)
+    return [output]
+
+
+def animate_job(tree, output, speed=0.8, dpi=100):
+    from animate_lineage import animate_lineage_by_time
+
+    animate_lineage_by_time(tree, output_gif=output, frame_duration=speed, dpi=dpi)
+    return [output]
+
+
+def fate_images_job(tree, output_dir="fate_images", dpi=300, fates=None):
+    from lineage_render import render_fate_images
+
+    # One process per job already; no nested pool
+    return render_fate_images(tree, output_dir=output_dir, dpi=dpi, workers=1, fates=fates)
+
+
+def time_images_job(tree, cutoffs, output_dir="time_images", dpi=300):
+    from lineage_layout import tree_layout
+    from lineage_render import render_panels, time_panels
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    layout = tree_layout(tree)
+    return render_panels(tree, time_panels(tree, layout, cutoffs, output_dir), dpi, workers=1, layout=layout)
+
+
+JOBS = {
+    "export": export_job,
+    "visualize": visualize_job,
+    "animate": animate_job,
+    "fate_images": fate_images_job,
+    "time_images": time_images_job,
+}
+
+
+# ==================== MANIFEST ====================
+
+def load_manifest(path):
+    """
+    Read a pipeline manifest: a JSON or YAML (needs PyYAML) mapping with an
+    "outputs" list. Each output is a mapping with a "type" (a key of JOBS)
+    and that job's options, e.g.
+
+        outputs:
+          - {type: export, output: out/lineage.graphml}
+          - {type: visualize, output: out/tree.png, fast: true}
+          - {type: fate_images, output_dir: out/fates}
+
+    Optional top-level keys: "workers" (process count) and "seed".
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError(f"Reading {path} needs PyYAML (pip install pyyaml), or use a JSON manifest")
+            manifest = yaml.safe_load(f)
+        else:
+            manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("outputs"), list):
+        raise ValueError(f"{path}: a manifest needs an 'outputs' list")
+    for i, job in enumerate(manifest["outputs"]):
+        check_job(job, i)
+    return manifest
+
+
+def check_job(job, index=0):
+    """Raise ValueError if `job` has an unknown type or options its function does not take."""
+    if not isinstance(job, dict) or job.get("type") not in JOBS:
+        raise ValueError(f"Output {index}: 'type' must be one of {', '.join(JOBS)}")
+    options = {key: value for key, value in job.items() if key != "type"}
+    try:
+        inspect.signature(JOBS[job["type"]]).bind(None, **options)
+    except TypeError as e:
+        raise ValueError(f"Output {index} ({job['type']}): {e}") from None
+
+
+def job_label(job):
+    target = job.get("output") or job.get("output_dir") or ""
+    return f"{job['type']} {target}".strip()
+
+
+# ==================== RUNNER ====================
+
+def _init_worker(tree):
+    global _tree
+    _tree = tree
+
+
+def _init_worker_process(tree):
+    # Pool workers never show windows; the serial path leaves the caller's backend alone
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    _init_worker(tree)
+
+
+def _run_job(job):
+    options = {key: value for key, value in job.items() if key != "type"}
+    if "output" in options:
+        Path(options["output"]).parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    paths = JOBS[job["type"]](_tree, **options)
+    return paths, time.perf_counter() - start
+
+
+def run_pipeline(tree, jobs, workers=None):
+    """
+    Run `jobs` (manifest outputs) against one annotated lineage. The tree
+    is sent once to each worker process and the jobs run concurrently; a
+    failing job is reported and does not stop the others.
+
+    Returns a list of (job, paths, seconds, error) in manifest order.
+    """
+    for i, job in enumerate(jobs):
+        check_job(job, i)
+    if workers is None:
+        workers = min(len(jobs), os.cpu_count() or 1)
+
+    results = [None] * len(jobs)
+    if workers <= 1:
+        _init_worker(tree)
+        for i, job in enumerate(jobs):
+            results[i] = _collect(job, _call(job))
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_process, initargs=(tree,)) as pool:
+        futures = {pool.submit(_run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = e
+            results[i] = _collect(jobs[i], outcome)
+    return results
+
+
+def _call(job):
+    try:
+        return _run_job(job)
+    except Exception as e:
+        return e
+
+
+def _collect(job, outcome):
+    if isinstance(outcome, Exception):
+        print(f"❌ {job_label(job)}: {outcome}")
+        return job, [], 0.0, outcome
+    paths, seconds = outcome
+    print(f"[✔] {job_label(job)} ({seconds:.1f}s)")
+    return job, paths, seconds, None
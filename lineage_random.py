@@ -0,0 +1,35 @@
+import random
+
+import numpy as np
+
+
+def as_random(rng=None):
+    """
+    Coerce `rng` to something with the random.Random interface.
+
+    None keeps the old behaviour (the global random module); an int seeds
+    a new random.Random; a NumPy Generator seeds one from its stream.
+    """
+    if rng is None or rng is random:
+        return random
+    if isinstance(rng, random.Random):
+        return rng
+    if isinstance(rng, np.random.Generator):
+        return random.Random(int(rng.integers(2**63)))
+    return random.Random(rng)
+
+
+def as_generator(rng=None):
+    """
+    Coerce `rng` to a NumPy Generator: an int or a SeedSequence goes
+    through default_rng, and a random.Random seeds one from its stream.
+    None, like in as_random, means the global random module, so
+    random.seed() still makes unseeded runs reproducible.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    if rng is None:
+        rng = random
+    if rng is random or isinstance(rng, random.Random):
+        return np.random.default_rng(rng.getrandbits(128))
+    return np.random.default_rng(rng)
@@ -0,0 +1,272 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+
+from fate_utils import FATE_COLORS
+from lineage_layout import tree_layout
+
+FIGSIZE = (14, 10)
+NODE_SIZE = 2500
+# Smallest marker area the fast drawing mode shrinks nodes to
+MIN_NODE_SIZE = 4
+FONT_SIZE = 9
+EDGE_COLOR = "gray"
+BACKGROUND_COLOR = "lightgray"
+# Most labels the fast drawing mode keeps on screen at once
+MAX_LABELS = 100
+
+# Per-process figure, built once by _init_worker and reused for every panel
+_scene = None
+
+
+class _Scene:
+    """
+    One Agg figure holding the whole tree: a LineCollection of edges, one
+    scatter collection per node shape and the labels. Panels only change
+    colors, visibility and the title.
+    """
+
+    def __init__(self, xy, segments, edge_parent, edge_child, square, labels, figsize, node_size, font_size):
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot()
+        ax.axis("off")
+        self.square = square
+        self.edge_parent = edge_parent
+        self.edge_child = edge_child
+
+        self.edges = LineCollection(segments, colors=EDGE_COLOR, zorder=1)
+        ax.add_collection(self.edges)
+        self.circles = ax.scatter(xy[~square, 0], xy[~square, 1], s=node_size, marker="o", zorder=2)
+        self.squares = ax.scatter(xy[square, 0], xy[square, 1], s=node_size, marker="s", zorder=2)
+        self.labels = [ax.text(x, y, label, fontsize=font_size, ha="center", va="center", zorder=3)
+                       for (x, y), label in zip(xy.tolist(), labels)]
+        ax.autoscale_view()
+        self.title = ax.set_title("")
+        self.figure.tight_layout()
+
+    def render(self, panel, dpi):
+        colors = panel["colors"]
+        visible = panel.get("visible")
+        if visible is not None:
+            colors = colors.copy()
+            colors[~visible, 3] = 0.0
+            edge_colors = np.tile(to_rgba_array(EDGE_COLOR), (len(self.edge_child), 1))
+            edge_colors[~(visible[self.edge_parent] & visible[self.edge_child]), 3] = 0.0
+            self.edges.set_color(edge_colors)
+            for label, shown in zip(self.labels, visible.tolist()):
+                label.set_visible(shown)
+        else:
+            self.edges.set_color(EDGE_COLOR)
+            for label in self.labels:
+                label.set_visible(True)
+        self.circles.set_facecolor(colors[~self.square])
+        self.squares.set_facecolor(colors[self.square])
+        self.title.set_text(panel.get("title", ""))
+        self.figure.savefig(panel["path"], dpi=dpi, bbox_inches="tight")
+        return panel["path"]
+
+
+def _init_worker(scene_args):
+    global _scene
+    _scene = _Scene(*scene_args)
+
+
+def _render_panel(panel, dpi):
+    return _scene.render(panel, dpi)
+
+
+def _scene_args(G, layout, figsize, node_size, font_size):
+    square = np.array([bool(G.nodes[node].get("syncytial")) for node in layout.nodes], dtype=bool)
+    edge_child = np.flatnonzero(layout.parent >= 0)
+    return (layout.xy, layout.edge_segments(), layout.parent[edge_child], edge_child, square, [str(node) for node in layout.nodes],
+            figsize, node_size, font_size)
+
+
+def render_panels(G, panels, dpi=300, workers=None, root="Zygote", layout=None,
+                  figsize=FIGSIZE, node_size=NODE_SIZE, font_size=FONT_SIZE):
+    """
+    Render `panels` of lineage G to image files. The layout is computed
+    once (or passed in) and each worker process draws every panel it gets
+    on a single reused Agg figure.
+
+    Each panel is a dict with "path", "title", "colors" (an RGBA array, one
+    row per node in layout order) and optionally "visible" (a bool mask).
+    Returns the written paths in panel order.
+    """
+    if layout is None:
+        layout = tree_layout(G, root)
+    scene_args = _scene_args(G, layout, figsize, node_size, font_size)
+    if workers is None:
+        workers = min(len(panels), os.cpu_count() or 1)
+
+    if workers <= 1:
+        _init_worker(scene_args)
+        return [_render_panel(panel, dpi) for panel in panels]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(scene_args,)) as pool:
+        return list(pool.map(_render_panel, panels, [dpi] * len(panels)))
+
+
+# ==================== PANEL BUILDERS ====================
+
+def fate_panels(G, layout, output_dir="fate_images", fates=None, colors=FATE_COLORS):
+    """One panel per fate, highlighting cells of that fate and graying out the rest."""
+    node_fates = [G.nodes[node].get("fate") for node in layout.nodes]
+    if fates is None:
+        fates = sorted({fate for fate in node_fates if fate is not None})
+    node_fates = np.array(node_fates, dtype=object)
+    panels = []
+    for fate in fates:
+        rgba = np.tile(to_rgba_array(BACKGROUND_COLOR), (len(layout), 1))
+        rgba[node_fates == fate] = to_rgba_array(colors.get(fate, BACKGROUND_COLOR))
+        panels.append({
+            "path": str(Path(output_dir) / f"lineage_fate_{fate}.png"),
+            "title": f"C. elegans Lineage — {fate.capitalize()} Cells Highlighted",
+            "colors": rgba,
+        })
+    return panels
+
+
+def expression_colors(values):
+    """Red→blue ramp for expression levels in [0, 1]; NaN (no data) is light gray."""
+    values = np.asarray(values, dtype=float)
+    rgba = np.empty((len(values), 4))
+    rgba[:, 0] = 1 - values
+    rgba[:, 1] = 1 - np.abs(0.5 - values)
+    rgba[:, 2] = values
+    rgba[:, 3] = 1.0
+    rgba[np.isnan(values)] = to_rgba_array(BACKGROUND_COLOR)
+    return np.clip(rgba, 0, 1)
+
+
+def gene_panels(G, layout, genes, output_dir="gene_images"):
+    """One panel per gene, coloring cells by their "expression" attribute."""
+    panels = []
+    for gene in genes:
+        values = [G.nodes[node].get("expression", {}).get(gene, np.nan) for node in layout.nodes]
+        panels.append({
+            "path": str(Path(output_dir) / f"lineage_gene_{gene}.png"),
+            "title": f"C. elegans Lineage — {gene} Expression",
+            "colors": expression_colors(values),
+        })
+    return panels
+
+
+def time_panels(G, layout, cutoffs, output_dir="time_images", colors=FATE_COLORS):
+    """One panel per division-time cutoff, showing only cells that have divided by then."""
+    base = to_rgba_array([colors.get(G.nodes[node].get("fate"), BACKGROUND_COLOR) for node in layout.nodes])
+    times = np.array([G.nodes[node].get("division_time", np.inf) for node in layout.nodes], dtype=float)
+    return [{
+        "path": str(Path(output_dir) / f"lineage_time_{cutoff:g}.png"),
+        "title": f"C. elegans Lineage — Cells by {cutoff:g} min",
+        "colors": base,
+        "visible": times <= cutoff,
+    } for cutoff in cutoffs]
+
+
+def render_fate_images(G, output_dir="fate_images", dpi=300, workers=None, root="Zygote", fates=None):
+    """Write one image per cell fate (see fate_panels) and return their paths."""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    layout = tree_layout(G, root)
+    paths = render_panels(G, fate_panels(G, layout, output_dir, fates), dpi, workers, root, layout)
+    for path in paths:
+        print(f"✅ Saved {path}")
+    return paths
+
+
+# ==================== FAST INTERACTIVE DRAWING ====================
+
+def fast_node_size(layout, figsize=FIGSIZE, max_size=NODE_SIZE, min_size=MIN_NODE_SIZE):
+    """Marker area (points²) that keeps nodes on the most crowded level from overlapping."""
+    widest = np.bincount(layout.depth).max()
+    levels = layout.depth.max() + 1
+    spacing = min(figsize[0] * 72 / widest, figsize[1] * 72 / levels)
+    return float(np.clip((0.8 * spacing) ** 2, min_size, max_size))
+
+
+class LabelCuller:
+    """
+    Keeps at most `max_labels` node labels on an axes: those in view, from
+    the shallowest levels down (or only down to `label_depth` if given).
+    Re-run on every zoom or pan, so zooming in reveals deeper labels.
+    Set `mask` (a bool array in layout order) and call update() to label
+    only some cells, e.g. those shown in an animation frame.
+    """
+
+    def __init__(self, ax, layout, max_labels=MAX_LABELS, label_depth=None, font_size=FONT_SIZE):
+        self.ax = ax
+        self.layout = layout
+        self.max_labels = max_labels
+        self.label_depth = label_depth
+        self.font_size = font_size
+        self.mask = None
+        self.texts = []
+        self.update()
+        ax.callbacks.connect("xlim_changed", self.update)
+        ax.callbacks.connect("ylim_changed", self.update)
+
+    def visible_index(self):
+        """Indices of the nodes to label in the current view."""
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        xy, depth = self.layout.xy, self.layout.depth
+        mask = (xy[:, 0] >= x0) & (xy[:, 0] <= x1) & (xy[:, 1] >= y0) & (xy[:, 1] <= y1)
+        if self.label_depth is not None:
+            mask &= depth <= self.label_depth
+        if self.mask is not None:
+            mask &= self.mask
+        index = np.flatnonzero(mask)
+        if len(index) > self.max_labels:
+            # Deepest level that still fits, so a level is labelled fully or not at all
+            counts = np.cumsum(np.bincount(depth[index]))
+            fits = np.flatnonzero(counts <= self.max_labels)
+            index = index[depth[index] <= fits[-1]] if len(fits) else index[:0]
+        return index
+
+    def update(self, ax=None):
+        for text in self.texts:
+            text.remove()
+        nodes, xy = self.layout.nodes, self.layout.xy
+        self.texts = [self.ax.text(xy[i, 0], xy[i, 1], str(nodes[i]), fontsize=self.font_size,
+                                   ha="center", va="center", zorder=3, clip_on=True)
+                      for i in self.visible_index().tolist()]
+
+
+def draw_lineage_fast(ax, G, layout, colors, node_size=None, label_depth=None, max_labels=MAX_LABELS,
+                      font_size=FONT_SIZE, edge_color=EDGE_COLOR):
+    """
+    Draw a laid-out lineage with a handful of artists: one LineCollection
+    for the edges, one scatter collection per node shape (circle, square
+    for syncytial cells) and labels culled by a LabelCuller.
+
+    `colors` maps fate to color. Returns (edges, circles, squares, culler).
+    """
+    palette = {}
+    rgba = np.empty((len(layout), 4))
+    square = np.zeros(len(layout), dtype=bool)
+    for i, node in enumerate(layout.nodes):
+        data = G.nodes[node]
+        fate = data.get("fate")
+        if fate not in palette:
+            palette[fate] = to_rgba_array(colors.get(fate, BACKGROUND_COLOR))[0]
+        rgba[i] = palette[fate]
+        square[i] = bool(data.get("syncytial"))
+    if node_size is None:
+        node_size = fast_node_size(layout, tuple(ax.figure.get_size_inches()))
+
+    xy = layout.xy
+    edges = LineCollection(layout.edge_segments(), colors=edge_color, zorder=1)
+    ax.add_collection(edges)
+    # No marker outlines: stroking thousands of tiny markers doubles the draw time
+    circles = ax.scatter(xy[~square, 0], xy[~square, 1], s=node_size, c=rgba[~square], marker="o",
+                         linewidths=0, zorder=2)
+    squares = ax.scatter(xy[square, 0], xy[square, 1], s=node_size, c=rgba[square], marker="s",
+                         linewidths=0, zorder=2)
+    ax.autoscale_view()
+    culler = LabelCuller(ax, layout, max_labels, label_depth, font_size)
+    return edges, circles, squares, culler
@@ -0,0 +1,239 @@
+import csv
+import json
+import math
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+# Column names in syncytial_lineage_min.csv/json; pass `columns` to map
+# other tables (e.g. WormBase exports) onto the same fields
+LINEAGE_COLUMNS = {
+    "cell": "Cell",
+    "parent": "Parent",
+    "fusion_group": "FusionGroup",
+    "time": "Time",
+    "fate": "Fate",
+}
+
+
+def _iter_rows(path, delimiter=None):
+    """Yield one dict per lineage row from a CSV/TSV, JSON array or JSON Lines file."""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        with open(path) as f:
+            yield from json.load(f)
+    elif suffix in (".jsonl", ".ndjson"):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        if delimiter is None:
+            delimiter = "\t" if suffix in (".tsv", ".tab") else ","
+        with open(path, newline='') as f:
+            yield from csv.DictReader(f, delimiter=delimiter)
+
+
+def _csr(keys, num_keys):
+    """Offsets and members grouping positions of `keys` (-1 ignored), stable in input order."""
+    keys = np.asarray(keys, dtype=np.int64)
+    members = np.flatnonzero(keys >= 0)
+    members = members[np.argsort(keys[members], kind='stable')]
+    counts = np.bincount(keys[keys >= 0], minlength=num_keys)
+    offsets = np.zeros(num_keys + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, members
+
+
+def _preorder(parent, offsets, child_index):
+    """
+    Preorder of a forest given as parent list plus _csr children (as
+    lists), from every root in index order. Raises ValueError if some
+    cells are unreachable, i.e. the parent links contain a cycle.
+    """
+    order = []
+    stack = [i for i in reversed(range(len(parent))) if parent[i] < 0]
+    while stack:
+        v = stack.pop()
+        order.append(v)
+        stack.extend(reversed(child_index[offsets[v]:offsets[v + 1]]))
+    if len(order) != len(parent):
+        raise ValueError("Parent links contain a cycle; lineage must be a forest")
+    return order
+
+
+class LineageStore:
+    """
+    Indexed lineage loaded from a cell table row by row (CSV/TSV and JSON
+    Lines are streamed; a JSON array is parsed whole).
+
+    Cells are numbered in order of first appearance (as a cell or as a
+    parent). Per-cell data lives in arrays: parent index (-1 for roots),
+    time (NaN if unknown), fate and fusion-group codes (-1 if none).
+    Children and fusion-group members are stored CSR-style, so
+    children()/fusion_group() are O(1) slices and subtree() is O(subtree).
+    """
+
+    def __init__(self, names, parent, time, fate_codes, fates, group_codes, groups):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.time = np.asarray(time, dtype=float)
+        self.fate_codes = np.asarray(fate_codes, dtype=np.int32)
+        self.fates = fates
+        self.group_codes = np.asarray(group_codes, dtype=np.int32)
+        self.groups = groups
+        self.group_index = {group: i for i, group in enumerate(groups)}
+
+        self.child_offsets, self.child_index = _csr(self.parent, len(names))
+        # Rejects cycles and self-parented rows, on which subtree() would never finish
+        _preorder(self.parent.tolist(), self.child_offsets.tolist(), self.child_index.tolist())
+        self.group_offsets, self.group_members = _csr(self.group_codes, len(groups))
+
+    # ==================== LOADING ====================
+
+    @classmethod
+    def from_rows(cls, rows, columns=None):
+        """Build from an iterable of row dicts (consumed once)."""
+        columns = dict(LINEAGE_COLUMNS, **(columns or {}))
+        names, index = [], {}
+        parent, time, fate_codes, group_codes = [], [], [], []
+        fates, fate_index = [], {}
+        groups, group_index = [], {}
+        described = set()
+
+        def cell_id(name):
+            i = index.get(name)
+            if i is None:
+                i = index[name] = len(names)
+                names.append(name)
+                parent.append(-1)
+                time.append(math.nan)
+                fate_codes.append(-1)
+                group_codes.append(-1)
+            return i
+
+        def code(value, table, lookup):
+            if value in (None, ""):
+                return -1
+            c = lookup.get(value)
+            if c is None:
+                c = lookup[value] = len(table)
+                table.append(value)
+            return c
+
+        for row in rows:
+            name = row[columns["cell"]]
+            i = cell_id(name)
+            if i in described:
+                raise ValueError(f"Cell {name!r} appears more than once")
+            described.add(i)
+
+            parent_name = row.get(columns["parent"])
+            if parent_name not in (None, ""):
+                parent[i] = cell_id(parent_name)
+            value = row.get(columns["time"])
+            time[i] = float(value) if value not in (None, "") else math.nan
+            fate_codes[i] = code(row.get(columns["fate"]), fates, fate_index)
+            group_codes[i] = code(row.get(columns["fusion_group"]), groups, group_index)
+
+        return cls(names, parent, time, fate_codes, fates, group_codes, groups)
+
+    @classmethod
+    def load(cls, path, columns=None, delimiter=None):
+        """
+        Load a lineage table: CSV/TSV (delimiter from the suffix unless
+        given), a JSON array of row objects, or JSON Lines. Prefer CSV or
+        JSON Lines for large tables; a JSON array is read into memory first.
+        Raises ValueError if the parent links contain a cycle.
+        """
+        return cls.from_rows(_iter_rows(path, delimiter), columns)
+
+    # ==================== LOOKUPS ====================
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def roots(self):
+        return [self.names[i] for i in np.flatnonzero(self.parent < 0)]
+
+    def parent_of(self, cell):
+        p = self.parent[self.index[cell]]
+        return self.names[p] if p >= 0 else None
+
+    def _children_index(self, i):
+        return self.child_index[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def children(self, cell):
+        return [self.names[c] for c in self._children_index(self.index[cell])]
+
+    def subtree_index(self, cell):
+        """Indexes of `cell` and all its descendants, in preorder."""
+        order = []
+        stack = [self.index[cell]]
+        offsets, child_index = self.child_offsets, self.child_index
+        while stack:
+            i = stack.pop()
+            order.append(i)
+            # Reversed so children come off the stack in file order
+            stack.extend(child_index[offsets[i]:offsets[i + 1]][::-1].tolist())
+        return np.asarray(order, dtype=np.int64)
+
+    def subtree(self, cell):
+        return [self.names[i] for i in self.subtree_index(cell)]
+
+    def fusion_group(self, group):
+        """Cells belonging to fusion group `group`."""
+        g = self.group_index[group]
+        return [self.names[i] for i in self.group_members[self.group_offsets[g]:self.group_offsets[g + 1]]]
+
+    def fate_of(self, cell):
+        code = self.fate_codes[self.index[cell]]
+        return self.fates[code] if code >= 0 else None
+
+    def group_of(self, cell):
+        code = self.group_codes[self.index[cell]]
+        return self.groups[code] if code >= 0 else None
+
+    def cell(self, name):
+        """All stored attributes of one cell."""
+        i = self.index[name]
+        time = self.time[i]
+        return {
+            "parent": self.parent_of(name),
+            "time": None if math.isnan(time) else time.item(),
+            "fate": self.fate_of(name),
+            "fusion_group": self.group_of(name),
+        }
+
+    # ==================== ADAPTERS ====================
+
+    def to_networkx(self):
+        """
+        A DiGraph using the attribute names of the rest of the toolkit:
+        division_time, fate, and syncytial/fusion_group for fused cells.
+        """
+        tree = nx.DiGraph()
+        for i, name in enumerate(self.names):
+            attrs = {}
+            if not math.isnan(self.time[i]):
+                attrs["division_time"] = self.time[i].item()
+            if self.fate_codes[i] >= 0:
+                attrs["fate"] = self.fates[self.fate_codes[i]]
+            if self.group_codes[i] >= 0:
+                attrs["fusion_group"] = self.groups[self.group_codes[i]]
+                attrs["syncytial"] = True
+            tree.add_node(name, **attrs)
+        names = self.names
+        tree.add_edges_from((names[p], names[i]) for i, p in enumerate(self.parent.tolist()) if p >= 0)
+        return tree
+
+
+def load_lineage_tree(path="syncytial_lineage_min.csv", columns=None):
+    """Load a lineage table straight into a DiGraph."""
+    return LineageStore.load(path, columns).to_networkx()
@@ -0,0 +1,490 @@
+import bisect
+import csv
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# ==================== LOG LAYOUT ====================
+
+PEPTIDE_LOG_FIELDS = ["index", "sequence", "length", "max_block", "inserted", "location"]
+MEMBRANE_GROWTH_FIELDS = ["step", "thickness_nm"]
+VESICLE_STATE_FIELDS = ["step", "membrane_thickness", "peptides_membrane",
+                        "peptides_cytoplasm", "peptides_discarded", "cytoplasm_full"]
+
+PEPTIDE_LOG_FILE = "peptide_log.csv"
+MEMBRANE_GROWTH_FILE = "membrane_growth_log.csv"
+VESICLE_STATE_FILE = "vesicle_state_log.csv"
+STATE_HISTORY_FILE = "state_history.csv"
+
+# Change-point rows carry the fate of the peptide at that step, which is what
+# lets StateHistory replay the counters between rows exactly
+STATE_HISTORY_FIELDS = VESICLE_STATE_FIELDS + ["location"]
+HISTORY_CHECKPOINT_EVERY = 1000
+LOCATION_COUNTERS = {
+    "membrane": "peptides_membrane",
+    "cytoplasm": "peptides_cytoplasm",
+    "discarded": "peptides_discarded",
+}
+
+# full: every step, sampled: every `log_every` steps, final: final_state.json only
+LOG_MODES = ("full", "sampled", "final")
+
+# ==================== SINKS ====================
+
+class MemoryLogSink:
+    """Collects log rows in Python lists (the original in-memory behaviour)."""
+
+    def __init__(self, resume=None):
+        if resume and resume.get("rows"):
+            raise ValueError("In-memory logs cannot be resumed; stream them to disk instead")
+        self.peptide_log = []
+        self.membrane_growth_log = []
+        self.vesicle_state_log = []
+
+    def write(self, peptide_row, growth_row, state_row):
+        self.peptide_log.append(peptide_row)
+        self.membrane_growth_log.append(growth_row)
+        self.vesicle_state_log.append(state_row)
+
+    def checkpoint(self):
+        return {"rows": len(self.peptide_log)}
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _open_for_resume(path, offset, mode, **kwargs):
+    """Reopen a log file, dropping anything written after `offset`."""
+    f = open(path, mode, **kwargs)
+    f.seek(offset)
+    f.truncate()
+    return f
+
+
+class _BufferedCsv:
+    """
+    A DictWriter that hands rows to the file in chunks of `chunk_size`.
+    Passing `offset` (from a checkpoint) continues an existing file there.
+    """
+
+    def __init__(self, path, fieldnames, chunk_size, offset=None):
+        if offset is None:
+            self.file = open(path, "w", newline='')
+        else:
+            self.file = _open_for_resume(path, offset, "r+", newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames)
+        if offset is None:
+            self.writer.writeheader()
+        self.chunk_size = chunk_size
+        self.buffer = []
+
+    def append(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.writer.writerows(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def offset(self):
+        self.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class StateHistoryWriter:
+    """
+    Writes only the steps where the vesicle state stops evolving uniformly:
+    the first and last step, any change of membrane_thickness or
+    cytoplasm_full, any change of peptide fate from the previous step, and
+    a counter checkpoint at least every `checkpoint_every` steps.
+    Needs every step in order (log_mode "full").
+    """
+
+    def __init__(self, path, checkpoint_every=HISTORY_CHECKPOINT_EVERY, chunk_size=1024, resume=None):
+        self.log = _BufferedCsv(path, STATE_HISTORY_FIELDS, chunk_size,
+                                offset=resume["offset"] if resume else None)
+        self.checkpoint_every = checkpoint_every
+        self.previous = resume["previous"] if resume else None
+        self.last_written_step = resume["last_written_step"] if resume else None
+
+    def record(self, state_row, location):
+        previous = self.previous
+        row = dict(state_row, location=location)
+        self.previous = row
+
+        if previous is not None and row["step"] != previous["step"] + 1:
+            raise ValueError("State history needs every step; use log_mode 'full'")
+
+        if (previous is None
+                or row["membrane_thickness"] != previous["membrane_thickness"]
+                or row["cytoplasm_full"] != previous["cytoplasm_full"]
+                or location != previous["location"]
+                or row["step"] - self.last_written_step >= self.checkpoint_every):
+            self._write(row)
+
+    def _write(self, row):
+        self.log.append(row)
+        self.last_written_step = row["step"]
+
+    def flush(self):
+        self.log.flush()
+
+    def checkpoint(self):
+        return {
+            "offset": self.log.offset(),
+            "previous": self.previous,
+            "last_written_step": self.last_written_step,
+        }
+
+    def close(self):
+        # Always close with the final step so readers know where the run ends
+        if self.previous is not None and self.previous["step"] != self.last_written_step:
+            self._write(self.previous)
+        self.log.close()
+
+
+class StateHistory:
+    """
+    Reader for state_history.csv. state_at(step) rebuilds the full
+    vesicle_state_log row for any step by binary search over the change
+    points, replaying the constant-fate run since the nearest one.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.steps = [row["step"] for row in rows]
+
+    @classmethod
+    def load(cls, path):
+        rows = []
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                rows.append({
+                    "step": int(row["step"]),
+                    "membrane_thickness": int(row["membrane_thickness"]),
+                    "peptides_membrane": int(row["peptides_membrane"]),
+                    "peptides_cytoplasm": int(row["peptides_cytoplasm"]),
+                    "peptides_discarded": int(row["peptides_discarded"]),
+                    "cytoplasm_full": row["cytoplasm_full"] == "True",
+                    "location": row["location"],
+                })
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def last_step(self):
+        return self.steps[-1] if self.steps else -1
+
+    def state_at(self, step):
+        """The vesicle_state_log row for `step`."""
+        if not 0 <= step <= self.last_step:
+            raise IndexError(f"step {step} outside recorded range 0..{self.last_step}")
+
+        anchor = self.rows[bisect.bisect_right(self.steps, step) - 1]
+        state = {field: anchor[field] for field in VESICLE_STATE_FIELDS}
+        state["step"] = step
+        state[LOCATION_COUNTERS[anchor["location"]]] += step - anchor["step"]
+        return state
+
+    def thickness_at(self, step):
+        return self.rows[bisect.bisect_right(self.steps, step) - 1]["membrane_thickness"]
+
+
+class CsvLogSink:
+    """
+    Streams the simulation logs to CSV while the run progresses.
+    At most `chunk_size` rows per log are held in memory at any time.
+
+    With state_history=True the per-step membrane growth and vesicle state
+    logs are replaced by a single change-point log (see StateHistoryWriter).
+
+    `resume` is the dict returned by checkpoint(); the existing files are
+    truncated back to that point and appended to.
+    """
+
+    def __init__(self, output_dir, chunk_size=1024, state_history=False,
+                 checkpoint_every=HISTORY_CHECKPOINT_EVERY, resume=None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        offsets = resume or {}
+        self.peptides = _BufferedCsv(self.output_dir / PEPTIDE_LOG_FILE, PEPTIDE_LOG_FIELDS, chunk_size,
+                                     offset=offsets.get("peptides"))
+        if state_history:
+            self.growth = None
+            self.states = None
+            self.history = StateHistoryWriter(self.output_dir / STATE_HISTORY_FILE, checkpoint_every, chunk_size,
+                                              resume=offsets.get("history"))
+        else:
+            self.growth = _BufferedCsv(self.output_dir / MEMBRANE_GROWTH_FILE, MEMBRANE_GROWTH_FIELDS, chunk_size,
+                                       offset=offsets.get("growth"))
+            self.states = _BufferedCsv(self.output_dir / VESICLE_STATE_FILE, VESICLE_STATE_FIELDS, chunk_size,
+                                       offset=offsets.get("states"))
+            self.history = None
+
+    def _logs(self):
+        return [log for log in (self.peptides, self.growth, self.states, self.history) if log is not None]
+
+    def write(self, peptide_row, growth_row, state_row):
+        self.peptides.append(peptide_row)
+        if self.history is not None:
+            self.history.record(state_row, peptide_row["location"])
+        else:
+            self.growth.append(growth_row)
+            self.states.append(state_row)
+
+    def flush(self):
+        for log in self._logs():
+            log.flush()
+
+    def checkpoint(self):
+        """Flush and return the file offsets needed to resume from here."""
+        if self.history is not None:
+            return {"peptides": self.peptides.offset(), "history": self.history.checkpoint()}
+        return {
+            "peptides": self.peptides.offset(),
+            "growth": self.growth.offset(),
+            "states": self.states.offset(),
+        }
+
+    def close(self):
+        for log in self._logs():
+            log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==================== COLUMNAR BACKEND ====================
+
+COLUMNAR_SCHEMA_FILE = "schema.json"
+LOG_FORMATS = ("csv", "columnar")
+
+# Residue codes match CHIRAL_POOL order in simulate_peptide_membrane; 3 pads past the end
+RESIDUE_CODES = {'L': 0, 'D': 1, '0': 2}
+RESIDUE_PAD = 3
+RESIDUES_PER_BYTE = 4
+LOCATION_CODES = {"membrane": 0, "cytoplasm": 1, "discarded": 2}
+
+_ASCII_TO_CODE = np.full(256, RESIDUE_PAD, dtype=np.uint8)
+for _char, _code in RESIDUE_CODES.items():
+    _ASCII_TO_CODE[ord(_char)] = _code
+_CODE_TO_ASCII = np.frombuffer(b"LD0?", dtype=np.uint8)
+
+PEPTIDE_COLUMNS = {
+    "index": "int32",
+    "length": "int16",
+    "max_block": "int16",
+    "inserted": "bool",
+    "location": "uint8",
+}
+STATE_COLUMNS = {
+    "step": "int32",
+    "membrane_thickness": "int16",
+    "peptides_membrane": "int32",
+    "peptides_cytoplasm": "int32",
+    "peptides_discarded": "int32",
+    "cytoplasm_full": "bool",
+}
+
+
+def pack_sequences(sequences, max_length):
+    """
+    Pack dash-joined sequences ("D-L-0-…") into 2-bit residue codes,
+    four residues per byte. Returns a (len(sequences), ceil(max_length / 4))
+    uint8 matrix; residues past a peptide's length are RESIDUE_PAD.
+    """
+    width = -(-max_length // RESIDUES_PER_BYTE)
+    lengths = np.fromiter(((len(s) + 1) // 2 for s in sequences), dtype=np.int64, count=len(sequences))
+    codes = np.full((len(sequences), width * RESIDUES_PER_BYTE), RESIDUE_PAD, dtype=np.uint8)
+
+    residues = np.frombuffer(''.join(s[::2] for s in sequences).encode(), dtype=np.uint8)
+    codes[np.arange(codes.shape[1]) < lengths[:, None]] = _ASCII_TO_CODE[residues]
+
+    codes = codes.reshape(len(sequences), width, RESIDUES_PER_BYTE)
+    return codes[..., 0] | (codes[..., 1] << 2) | (codes[..., 2] << 4) | (codes[..., 3] << 6)
+
+
+def unpack_sequences(packed):
+    """Inverse of pack_sequences: a (rows, 4 * width) matrix of residue codes."""
+    packed = np.asarray(packed, dtype=np.uint8)
+    codes = np.stack([(packed >> shift) & 0b11 for shift in (0, 2, 4, 6)], axis=-1)
+    return codes.reshape(packed.shape[0], -1)
+
+
+def decode_sequence(packed_row, length):
+    """The dash-joined sequence string for one packed row."""
+    codes = unpack_sequences(np.asarray(packed_row)[None, :])[0, :length]
+    return '-'.join(_CODE_TO_ASCII[codes].tobytes().decode())
+
+
+class _ColumnTable:
+    """Appends typed columns to raw native-endian files, one file per column."""
+
+    def __init__(self, directory, name, columns, chunk_size, offsets=None):
+        self.columns = columns
+        self.chunk_size = chunk_size
+        self.buffers = {column: [] for column in columns}
+        self.buffered_rows = 0
+        self.files = {}
+        for column in columns:
+            path = directory / f"{name}.{column}.bin"
+            if offsets is None:
+                self.files[column] = open(path, "wb")
+            else:
+                self.files[column] = _open_for_resume(path, offsets[column], "r+b")
+
+    def append(self, row):
+        for column, buffer in self.buffers.items():
+            buffer.append(row[column])
+        self.buffered_rows += 1
+        if self.buffered_rows >= self.chunk_size:
+            self.flush()
+
+    def _encode(self, column, values):
+        return np.asarray(values, dtype=self.columns[column])
+
+    def flush(self):
+        for column, buffer in self.buffers.items():
+            if buffer:
+                self._encode(column, buffer).tofile(self.files[column])
+                buffer.clear()
+            self.files[column].flush()
+        self.buffered_rows = 0
+
+    def offsets(self):
+        self.flush()
+        return {column: f.tell() for column, f in self.files.items()}
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+
+class _PeptideTable(_ColumnTable):
+    def __init__(self, directory, chunk_size, max_length, offsets=None):
+        columns = dict(PEPTIDE_COLUMNS, sequence="uint8")
+        super().__init__(directory, "peptides", columns, chunk_size, offsets)
+        self.max_length = max_length
+
+    def _encode(self, column, values):
+        if column == "sequence":
+            return pack_sequences(values, self.max_length)
+        if column == "location":
+            return np.fromiter((LOCATION_CODES[v] for v in values), dtype=np.uint8, count=len(values))
+        return super()._encode(column, values)
+
+
+class ColumnarLogSink:
+    """
+    Writes the simulation logs as typed binary columns that can be
+    memory-mapped with load_columnar_logs instead of re-parsing CSV.
+
+    peptides.*: index, length, max_block, inserted, location (categorical
+    code, see LOCATION_CODES) and sequence (2-bit packed, see pack_sequences).
+    states.*: one row per logged step; the membrane growth log is the
+    step/membrane_thickness projection of this table.
+    """
+
+    def __init__(self, output_dir, max_peptide_length, chunk_size=4096, resume=None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        offsets = resume or {}
+        self.peptides = _PeptideTable(self.output_dir, chunk_size, max_peptide_length, offsets.get("peptides"))
+        self.states = _ColumnTable(self.output_dir, "states", STATE_COLUMNS, chunk_size, offsets.get("states"))
+
+        schema = {
+            "peptides": dict(PEPTIDE_COLUMNS, sequence="uint8"),
+            "states": STATE_COLUMNS,
+            "sequence_width": -(-max_peptide_length // RESIDUES_PER_BYTE),
+            "max_peptide_length": max_peptide_length,
+            "location_codes": LOCATION_CODES,
+            "residue_codes": RESIDUE_CODES,
+            "byteorder": sys.byteorder,
+        }
+        with open(self.output_dir / COLUMNAR_SCHEMA_FILE, "w") as f:
+            json.dump(schema, f, indent=4)
+
+    def write(self, peptide_row, growth_row, state_row):
+        self.peptides.append(peptide_row)
+        self.states.append(state_row)
+
+    def flush(self):
+        self.peptides.flush()
+        self.states.flush()
+
+    def checkpoint(self):
+        return {"peptides": self.peptides.offsets(), "states": self.states.offsets()}
+
+    def close(self):
+        self.peptides.close()
+        self.states.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_columnar_logs(directory, mmap=True):
+    """
+    Open logs written by ColumnarLogSink.
+    Returns {"peptides": {column: array}, "states": {column: array}}; with
+    mmap=True the arrays are read-only views onto the files.
+    """
+    directory = Path(directory)
+    with open(directory / COLUMNAR_SCHEMA_FILE) as f:
+        schema = json.load(f)
+
+    tables = {}
+    for table in ("peptides", "states"):
+        tables[table] = {}
+        for column, dtype in schema[table].items():
+            path = directory / f"{table}.{column}.bin"
+            shape = (-1, schema["sequence_width"]) if column == "sequence" else (-1,)
+            if mmap and path.stat().st_size:
+                data = np.memmap(path, dtype=dtype, mode="r")
+            else:
+                data = np.fromfile(path, dtype=dtype)
+            tables[table][column] = data.reshape(shape)
+    return tables
+
+
+def open_log_sink(log_format, output_dir, max_peptide_length, chunk_size=1024, state_history=False,
+                  resume=None, log_mode="full"):
+    """
+    Create the streaming sink for `log_format` ("csv" or "columnar").
+    `resume` is the sink section of a simulation checkpoint, if any.
+    `log_mode` is the run's SimulationConfig.log_mode, checked against
+    state_history before any file is created.
+    """
+    if state_history and log_mode != "full":
+        raise ValueError(f"State history needs every step; use log_mode 'full', not {log_mode!r}")
+    if log_format == "csv":
+        return CsvLogSink(output_dir, chunk_size=chunk_size, state_history=state_history, resume=resume)
+    if state_history:
+        raise ValueError("State history is only available with the csv log format")
+    if log_format == "columnar":
+        return ColumnarLogSink(output_dir, max_peptide_length, chunk_size=chunk_size, resume=resume)
+    raise ValueError(f"Unknown log format: {log_format!r}")
@@ -1,4 +1,4 @@
-from setuptools import setup, find_packages
+from setuptools import setup
 
 # Read in your README.md for long description (optional but recommended)
 with open("README.md", "r", encoding="utf-8") as f:
@@ -7,17 +7,8 @@ with open("README.md", "r", encoding="utf-8") as f:
 setup(
     name='c_elegans_lineage',                      # Project name
     version='0.1.0',                                # Version
-    packages=find_packages(),                      # Automatically find package modules
-    install_requires=[                             # Required dependencies
-        'networkx',
-        'matplotlib',
-        'imageio'
-    ],
-    entry_points={                                 # CLI command mapping
-        'console_scripts': [
-            'lineage-cli = c_elegans_lineage.lineage_cli:main'
-        ]
-    },
+    # Modules, dependencies and the lineage-cli script are declared in
+    # pyproject.toml, which takes precedence over the arguments here
     author='Your Name',                             # Author name
     author_email='your.email@example.com',          # Author email
     description='🧬 CLI Toolkit for Modeling and Visualizing C. elegans Lineage Trees',
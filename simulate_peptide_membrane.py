@@ -1,12 +1,18 @@
 import random
 import csv
 import json
+import os
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
+import numpy as np
+
+from peptide_logs import (LOG_MODES, MEMBRANE_GROWTH_FIELDS, PEPTIDE_LOG_FIELDS, VESICLE_STATE_FIELDS,
+                          MemoryLogSink, open_log_sink)
+
 # ==================== CONFIGURATION ====================
 
 OUTPUT_DIR = Path("logs")
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 NUM_PEPTIDES = 10000
 GLYCINE_FRACTION = 0.01
@@ -19,27 +25,118 @@ MAX_PEPTIDE_LENGTH = 120
 CYTOPLASM_CAPACITY = 1000  # number of peptides
 MAX_PEPTIDES_PER_AREA = 0.5  # peptides per nm² membrane area
 
+SIMULATION_MODE = "scalar"  # "scalar" (one residue at a time) or "batch" (NumPy blocks)
+BATCH_SIZE = 4096  # peptides generated per block in batch mode
+
+LOG_MODE = "full"  # "full", "sampled" (every LOG_EVERY steps) or "final" (final_state.json only)
+LOG_EVERY = 100
+LOG_FORMAT = "csv"  # "csv" or "columnar" (memory-mappable binary columns in logs/columnar)
+STATE_HISTORY = False  # csv only: write state_history.csv change points instead of per-step state logs
+
+CHECKPOINT_EVERY = 0  # peptides between checkpoints; 0 disables. An existing checkpoint is resumed.
+CHECKPOINT_FILE = "checkpoint.json"
+CHECKPOINT_VERSION = 1
+
 CHIRAL_POOL = ['L', 'D', '0']
-L_fraction = (1 - GLYCINE_FRACTION) * ENANTIOMERIC_EXCESS
-D_fraction = (1 - GLYCINE_FRACTION) * (1 - ENANTIOMERIC_EXCESS)
-G_fraction = GLYCINE_FRACTION
-CHIRAL_WEIGHTS = [L_fraction, D_fraction, G_fraction]
+
+
+@dataclass(frozen=True)
+class SimulationConfig:
+    """Parameters of one vesicle run; defaults mirror the module constants above."""
+    num_peptides: int = NUM_PEPTIDES
+    glycine_fraction: float = GLYCINE_FRACTION
+    enantiomeric_excess: float = ENANTIOMERIC_EXCESS
+    initial_membrane_thickness: int = INITIAL_MEMBRANE_THICKNESS
+    max_membrane_thickness: int = MAX_MEMBRANE_THICKNESS
+    block_growth_threshold: float = BLOCK_GROWTH_THRESHOLD
+    vesicle_diameter: float = VESICLE_DIAMETER
+    max_peptide_length: int = MAX_PEPTIDE_LENGTH
+    cytoplasm_capacity: int = CYTOPLASM_CAPACITY
+    max_peptides_per_area: float = MAX_PEPTIDES_PER_AREA
+    mode: str = SIMULATION_MODE
+    batch_size: int = BATCH_SIZE
+    log_mode: str = LOG_MODE
+    log_every: int = LOG_EVERY
+
+    @property
+    def chiral_weights(self):
+        """Sampling weights for CHIRAL_POOL (L, D, glycine)."""
+        l_fraction = (1 - self.glycine_fraction) * self.enantiomeric_excess
+        d_fraction = (1 - self.glycine_fraction) * (1 - self.enantiomeric_excess)
+        return [l_fraction, d_fraction, self.glycine_fraction]
+
+    @property
+    def membrane_area(self):
+        """Membrane area (approximate sphere surface)."""
+        return 4 * 3.1415 * (self.vesicle_diameter / 2) ** 2
+
+    @property
+    def max_peptides_membrane(self):
+        return int(self.membrane_area * self.max_peptides_per_area)
+
+
+# Derived defaults, kept for scripts that read them off the module
+CHIRAL_WEIGHTS = SimulationConfig().chiral_weights
+L_fraction, D_fraction, G_fraction = CHIRAL_WEIGHTS
 
 # ==================== STATE VARIABLES ====================
 
-membrane_thickness = INITIAL_MEMBRANE_THICKNESS
-inserted_peptides = 0
-cytoplasmic_peptides = 0
-discarded_peptides = 0
-cytoplasm_full = False
+@dataclass
+class VesicleState:
+    """Mutable state of a single vesicle during a run."""
+    membrane_thickness: int = INITIAL_MEMBRANE_THICKNESS
+    inserted_peptides: int = 0
+    cytoplasmic_peptides: int = 0
+    discarded_peptides: int = 0
+    cytoplasm_full: bool = False
+
+    def apply_peptide(self, config, length, reached):
+        """
+        Update the vesicle with one finished peptide.
+        Returns (inserted, fate) where fate is membrane, cytoplasm or discarded.
+        """
+        if reached and self.inserted_peptides < config.max_peptides_membrane:
+            # Peptide is accepted into membrane
+            self.inserted_peptides += 1
+            if self.membrane_thickness < config.max_membrane_thickness:
+                self.membrane_thickness += 1
+            return True, "membrane"
 
-membrane_growth_log = []
-peptide_logs = []
-vesicle_state_log = []
+        if length >= config.max_peptide_length:
+            if not self.cytoplasm_full:
+                self.cytoplasmic_peptides += 1
+                if self.cytoplasmic_peptides >= config.cytoplasm_capacity:
+                    self.cytoplasm_full = True
+                return False, "cytoplasm"
+            self.discarded_peptides += 1
+            return False, "discarded"
 
-# Membrane area (approximate sphere surface)
-membrane_area = 4 * 3.1415 * (VESICLE_DIAMETER / 2) ** 2
-max_peptides_membrane = int(membrane_area * MAX_PEPTIDES_PER_AREA)
+        # incomplete peptide (block reached but membrane already saturated)
+        self.discarded_peptides += 1
+        return False, "discarded"
+
+    def as_log_row(self, step):
+        return {
+            "step": step,
+            "membrane_thickness": self.membrane_thickness,
+            "peptides_membrane": self.inserted_peptides,
+            "peptides_cytoplasm": self.cytoplasmic_peptides,
+            "peptides_discarded": self.discarded_peptides,
+            "cytoplasm_full": self.cytoplasm_full
+        }
+
+
+@dataclass
+class SimulationResult:
+    """
+    Final state plus the per-step logs of one run. The logs are only
+    populated when the run used the default in-memory sink.
+    """
+    config: SimulationConfig
+    final_state: dict
+    peptide_log: list = field(default_factory=list)
+    membrane_growth_log: list = field(default_factory=list)
+    vesicle_state_log: list = field(default_factory=list)
 
 # ==================== HELPER FUNCTIONS ====================
 
@@ -54,102 +151,377 @@ def longest_chiral_block(seq, target):
             count = 0
     return max_count
 
+class ChiralBlockTracker:
+    """
+    Streaming equivalent of longest_chiral_block for both chiralities.
+    Each push() updates the current and longest L/D runs in O(1).
+    """
+    __slots__ = ("current", "run", "max_l", "max_d")
+
+    def __init__(self):
+        self.current = None
+        self.run = 0
+        self.max_l = 0
+        self.max_d = 0
+
+    def push(self, aa):
+        """Append one residue and return the longest L or D block so far."""
+        if aa == self.current:
+            self.run += 1
+        else:
+            self.current = aa
+            self.run = 1
+        if aa == 'L':
+            if self.run > self.max_l:
+                self.max_l = self.run
+        elif aa == 'D':
+            if self.run > self.max_d:
+                self.max_d = self.run
+        return self.max_block
+
+    @property
+    def max_block(self):
+        return self.max_l if self.max_l > self.max_d else self.max_d
+
 def generate_peptide():
     return []
 
-# ==================== MAIN SIMULATION ====================
+class ScalarPeptideSource:
+    """Draws residues one at a time from a random.Random instance."""
 
-for i in range(NUM_PEPTIDES):
-    peptide = []
-    inserted = False
-    max_block = 0
+    def __init__(self, rng, config):
+        self.rng = rng
+        self.weights = config.chiral_weights
+        self.max_length = config.max_peptide_length
 
-    for _ in range(MAX_PEPTIDE_LENGTH):
-        aa = random.choices(CHIRAL_POOL, weights=CHIRAL_WEIGHTS, k=1)[0]
-        peptide.append(aa)
+    def get_state(self):
+        version, internal, gauss = self.rng.getstate()
+        return {"rng": [version, list(internal), gauss]}
 
-        l_block = longest_chiral_block(peptide, 'L')
-        d_block = longest_chiral_block(peptide, 'D')
-        max_block = max(l_block, d_block)
+    def set_state(self, state):
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
 
-        if max_block >= membrane_thickness * BLOCK_GROWTH_THRESHOLD:
-            # Peptide is accepted into membrane
-            if inserted_peptides < max_peptides_membrane:
-                inserted = True
-                inserted_peptides += 1
-                if membrane_thickness < MAX_MEMBRANE_THICKNESS:
-                    membrane_thickness += 1
-            break
-
-    # If not inserted
-    if not inserted:
-        if len(peptide) >= MAX_PEPTIDE_LENGTH:
-            if not cytoplasm_full:
-                cytoplasmic_peptides += 1
-                if cytoplasmic_peptides >= CYTOPLASM_CAPACITY:
-                    cytoplasm_full = True
-                fate = "cytoplasm"
-            else:
-                discarded_peptides += 1
-                fate = "discarded"
+    def next_peptide(self, threshold):
+        """
+        Draw residues until a chiral block reaches `threshold` or the peptide
+        hits the maximum length.
+        Returns (sequence, length, max_block, reached).
+        """
+        peptide = []
+        max_block = 0
+        tracker = ChiralBlockTracker()
+        choices = self.rng.choices
+        weights = self.weights
+
+        for _ in range(self.max_length):
+            aa = choices(CHIRAL_POOL, weights=weights, k=1)[0]
+            peptide.append(aa)
+
+            # Incremental equivalent of max(longest_chiral_block(peptide, 'L'),
+            # longest_chiral_block(peptide, 'D')) without rescanning the peptide
+            max_block = tracker.push(aa)
+
+            if max_block >= threshold:
+                return '-'.join(peptide), len(peptide), max_block, True
+
+        return '-'.join(peptide), len(peptide), max_block, False
+
+# ==================== BATCH ENGINE ====================
+
+# Residue codes used by the batch engine are indices into CHIRAL_POOL
+GLYCINE_CODE = CHIRAL_POOL.index('0')
+_CODE_TO_ASCII = np.frombuffer(''.join(CHIRAL_POOL).encode(), dtype=np.uint8)
+
+def generate_peptide_block(rng, num_peptides, length, weights):
+    """Draw a (num_peptides, length) int8 matrix of residue codes."""
+    cumulative = np.cumsum(weights, dtype=float)
+    cumulative /= cumulative[-1]
+    uniform = rng.random((num_peptides, length))
+    codes = np.zeros((num_peptides, length), dtype=np.int8)
+    for edge in cumulative[:-1]:
+        codes += uniform >= edge
+    return codes
+
+def chiral_run_lengths(block):
+    """
+    Length of the L/D run ending at each residue of every row in `block`
+    (0 at glycine positions), computed without a Python-level loop.
+    """
+    num_rows, length = block.shape
+    positions = np.arange(length, dtype=np.int32)
+
+    run_start = np.empty(block.shape, dtype=bool)
+    run_start[:, 0] = True
+    np.not_equal(block[:, 1:], block[:, :-1], out=run_start[:, 1:])
+    run_start |= block == GLYCINE_CODE
+
+    start_index = np.where(run_start, positions, 0)
+    np.maximum.accumulate(start_index, axis=1, out=start_index)
+
+    runs = positions - start_index + 1
+    runs[block == GLYCINE_CODE] = 0
+    return runs.astype(np.int16)
+
+class BatchPeptideSource:
+    """
+    Generates peptides in blocks of `config.batch_size` and answers the same
+    question as ScalarPeptideSource: where (if anywhere) the longest
+    chiral block first reaches the current threshold.
+    """
+
+    def __init__(self, rng, config):
+        self.rng = rng
+        self.weights = config.chiral_weights
+        self.max_length = config.max_peptide_length
+        self.block_size = config.batch_size
+        self.row = self.block_size
+        self.block = None
+        self.running_max = None
+        self.full_max = None
+        self.text = b""
+        self.stride = 2 * self.max_length - 1
+        self.block_rng_state = None
+
+    def get_state(self):
+        """
+        Generator state from just before the current block was drawn, plus
+        the position within it, so set_state can regenerate the same block.
+        Once the block is used up the next one has not been drawn yet, so the
+        current generator state is saved instead.
+        """
+        if self.block is None or self.row >= self.block_size:
+            return {"rng": self.rng.bit_generator.state, "row": self.block_size}
+        return {"rng": self.block_rng_state, "row": self.row}
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state["rng"]
+        if state["row"] < self.block_size:
+            self._refill()
+        self.row = state["row"]
+
+    def _refill(self):
+        self.block_rng_state = self.rng.bit_generator.state
+        self.block = generate_peptide_block(self.rng, self.block_size, self.max_length, self.weights)
+        self.running_max = np.maximum.accumulate(chiral_run_lengths(self.block), axis=1)
+        self.full_max = self.running_max[:, -1].tolist()
+        self.row = 0
+
+        # Dash-joined sequences for the whole block, one fixed-width row each
+        chars = np.full((self.block_size, self.stride), ord('-'), dtype=np.uint8)
+        chars[:, ::2] = _CODE_TO_ASCII[self.block]
+        self.text = chars.tobytes()
+
+    def next_peptide(self, threshold):
+        """Return (sequence, length, max_block, reached) for the next peptide."""
+        if self.row == self.block_size:
+            self._refill()
+        row = self.row
+        self.row += 1
+
+        if self.full_max[row] >= threshold:
+            cut = int(np.searchsorted(self.running_max[row], threshold, side='left'))
+            length = cut + 1
+            max_block = int(self.running_max[row, cut])
+            reached = True
         else:
-            # incomplete peptide (shouldn't happen here)
-            discarded_peptides += 1
-            fate = "discarded"
-    else:
-        fate = "membrane"
-
-    # Log this peptide
-    peptide_logs.append({
-        "index": i,
-        "sequence": '-'.join(peptide),
-        "length": len(peptide),
-        "max_block": max_block,
-        "inserted": inserted,
-        "location": fate
-    })
-
-    membrane_growth_log.append({
-        "step": i,
-        "thickness_nm": membrane_thickness
-    })
-
-    vesicle_state_log.append({
-        "step": i,
-        "membrane_thickness": membrane_thickness,
-        "peptides_membrane": inserted_peptides,
-        "peptides_cytoplasm": cytoplasmic_peptides,
-        "peptides_discarded": discarded_peptides,
-        "cytoplasm_full": cytoplasm_full
-    })
+            length = self.max_length
+            max_block = self.full_max[row]
+            reached = False
+
+        start = row * self.stride
+        sequence = self.text[start:start + 2 * length - 1].decode()
+        return sequence, length, max_block, reached
+
+# ==================== MAIN SIMULATION ====================
+
+def make_rng(config, seed=None):
+    """
+    Build the generator type the configured engine expects:
+    random.Random for "scalar", numpy.random.Generator for "batch".
+    `seed` may be None, an int or a numpy SeedSequence.
+    """
+    if config.mode == "scalar":
+        if isinstance(seed, np.random.SeedSequence):
+            seed = int.from_bytes(seed.generate_state(4).tobytes(), "little")
+        return random.Random(seed)
+    if config.mode == "batch":
+        return np.random.default_rng(seed)
+    raise ValueError(f"Unknown simulation mode: {config.mode!r}")
+
+def make_peptide_source(config, rng):
+    if config.mode == "scalar":
+        return ScalarPeptideSource(rng, config)
+    if config.mode == "batch":
+        return BatchPeptideSource(rng, config)
+    raise ValueError(f"Unknown simulation mode: {config.mode!r}")
+
+def run_simulation(config=None, rng=None, sink=None, checkpoint_path=None, checkpoint_every=0,
+                   resume_from=None):
+    """
+    Run one vesicle simulation and return a SimulationResult.
+
+    `rng` is the engine's generator (see make_rng); None, an int or a
+    SeedSequence is treated as a seed. Log rows selected by
+    config.log_mode go to `sink` (see peptide_logs); without one they are
+    kept in memory and returned on the result. The caller owns `sink`
+    and is responsible for closing it.
+
+    With `checkpoint_path` and `checkpoint_every`, the run state is saved
+    every `checkpoint_every` peptides. Passing a loaded checkpoint as
+    `resume_from` (and a sink reopened from its "sink" section) continues
+    the run exactly where it stopped.
+    """
+    if config is None:
+        config = SimulationConfig()
+    if config.log_mode not in LOG_MODES:
+        raise ValueError(f"Unknown log mode: {config.log_mode!r}")
+    if rng is None or isinstance(rng, (int, np.random.SeedSequence)):
+        rng = make_rng(config, rng)
+
+    memory_sink = None
+    if sink is None:
+        memory_sink = MemoryLogSink(resume=resume_from["sink"] if resume_from else None)
+        sink = memory_sink
+
+    source = make_peptide_source(config, rng)
+    draw_peptide = source.next_peptide
+    state = VesicleState(membrane_thickness=config.initial_membrane_thickness)
+    log_all = config.log_mode == "full"
+    log_every = config.log_every if config.log_mode == "sampled" else 0
+
+    first_step = 0
+    if resume_from is not None:
+        if resume_from["config"] != asdict(config):
+            raise ValueError("Checkpoint was written for a different SimulationConfig")
+        state = VesicleState(**resume_from["state"])
+        source.set_state(resume_from["source"])
+        first_step = resume_from["step"]
+
+    for i in range(first_step, config.num_peptides):
+        sequence, length, max_block, reached = draw_peptide(
+            state.membrane_thickness * config.block_growth_threshold)
+        inserted, fate = state.apply_peptide(config, length, reached)
+
+        if log_all or (log_every and i % log_every == 0):
+            # Log this peptide
+            sink.write({
+                "index": i,
+                "sequence": sequence,
+                "length": length,
+                "max_block": max_block,
+                "inserted": inserted,
+                "location": fate
+            }, {
+                "step": i,
+                "thickness_nm": state.membrane_thickness
+            }, state.as_log_row(i))
+
+        if checkpoint_every and (i + 1) % checkpoint_every == 0 and checkpoint_path is not None:
+            save_checkpoint(checkpoint_path, config, i + 1, state, source, sink)
+
+    result = SimulationResult(config=config, final_state=final_state_dict(config, state))
+    if memory_sink is not None:
+        result.peptide_log = memory_sink.peptide_log
+        result.membrane_growth_log = memory_sink.membrane_growth_log
+        result.vesicle_state_log = memory_sink.vesicle_state_log
+    return result
+
+# ==================== CHECKPOINTS ====================
+
+def save_checkpoint(path, config, step, state, source, sink):
+    """
+    Atomically write everything needed to resume at `step`: vesicle state,
+    generator state and the sink's flushed file offsets.
+    """
+    checkpoint = {
+        "version": CHECKPOINT_VERSION,
+        "step": step,
+        "config": asdict(config),
+        "state": asdict(state),
+        "source": source.get_state(),
+        "sink": sink.checkpoint(),
+    }
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def load_checkpoint(path):
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {checkpoint.get('version')!r}")
+    return checkpoint
+
+def final_state_dict(config, state):
+    """The final_state.json payload for a finished run."""
+    return {
+        "final_membrane_thickness": state.membrane_thickness,
+        "total_peptides_tested": config.num_peptides,
+        "inserted": state.inserted_peptides,
+        "cytoplasm": state.cytoplasmic_peptides,
+        "discarded": state.discarded_peptides,
+        "cytoplasm_full": state.cytoplasm_full
+    }
 
 # ==================== EXPORT LOGS ====================
 
-def write_csv(filename, fieldnames, rows):
-    with open(OUTPUT_DIR / filename, "w", newline='') as f:
+def write_csv(filename, fieldnames, rows, output_dir=OUTPUT_DIR):
+    with open(Path(output_dir) / filename, "w", newline='') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(rows)
 
-write_csv("membrane_growth_log.csv", ["step", "thickness_nm"], membrane_growth_log)
-write_csv("peptide_log.csv", ["index", "sequence", "length", "max_block", "inserted", "location"], peptide_logs)
-write_csv("vesicle_state_log.csv", ["step", "membrane_thickness", "peptides_membrane",
-                                    "peptides_cytoplasm", "peptides_discarded", "cytoplasm_full"], vesicle_state_log)
+def write_final_state(final_state, output_dir=OUTPUT_DIR):
+    with open(Path(output_dir) / "final_state.json", "w") as f:
+        json.dump(final_state, f, indent=4)
+
+def write_outputs(result, output_dir=OUTPUT_DIR):
+    """Write the three CSV logs and final_state.json for an in-memory `result`."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    write_csv("membrane_growth_log.csv", MEMBRANE_GROWTH_FIELDS, result.membrane_growth_log, output_dir)
+    write_csv("peptide_log.csv", PEPTIDE_LOG_FIELDS, result.peptide_log, output_dir)
+    write_csv("vesicle_state_log.csv", VESICLE_STATE_FIELDS, result.vesicle_state_log, output_dir)
 
-# Final state JSON
-final_state = {
-    "final_membrane_thickness": membrane_thickness,
-    "total_peptides_tested": NUM_PEPTIDES,
-    "inserted": inserted_peptides,
-    "cytoplasm": cytoplasmic_peptides,
-    "discarded": discarded_peptides,
-    "cytoplasm_full": cytoplasm_full
-}
+    # Final state JSON
+    write_final_state(result.final_state, output_dir)
+
+def main():
+    config = SimulationConfig()
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    checkpoint_path = OUTPUT_DIR / CHECKPOINT_FILE
+    resume_from = None
+    if CHECKPOINT_EVERY and checkpoint_path.exists():
+        resume_from = load_checkpoint(checkpoint_path)
+        print(f"Resuming from checkpoint at step {resume_from['step']}")
+    run_kwargs = dict(checkpoint_path=checkpoint_path, checkpoint_every=CHECKPOINT_EVERY,
+                      resume_from=resume_from)
+
+    # Stream per-step logs to disk as the run progresses
+    log_dir = OUTPUT_DIR / "columnar" if LOG_FORMAT == "columnar" else OUTPUT_DIR
+    if config.log_mode == "final":
+        result = run_simulation(config, **run_kwargs)
+    else:
+        with open_log_sink(LOG_FORMAT, log_dir, config.max_peptide_length, state_history=STATE_HISTORY,
+                           resume=resume_from["sink"] if resume_from else None,
+                           log_mode=config.log_mode) as sink:
+            result = run_simulation(config, sink=sink, **run_kwargs)
+    write_final_state(result.final_state, OUTPUT_DIR)
+    if checkpoint_path.exists():
+        checkpoint_path.unlink()
 
-with open(OUTPUT_DIR / "final_state.json", "w") as f:
-    json.dump(final_state, f, indent=4)
+    final_state = result.final_state
+    print(f"[✔] Simulation complete.")
+    print(f"Membrane thickness: {final_state['final_membrane_thickness']}")
+    print(f"Inserted: {final_state['inserted']}, Cytoplasm: {final_state['cytoplasm']}, Discarded: {final_state['discarded']}")
 
-print(f"[✔] Simulation complete.")
-print(f"Membrane thickness: {membrane_thickness}")
-print(f"Inserted: {inserted_peptides}, Cytoplasm: {cytoplasmic_peptides}, Discarded: {discarded_peptides}")
 
+if __name__ == "__main__":
+    main()
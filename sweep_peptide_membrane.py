@@ -0,0 +1,138 @@
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from simulate_peptide_membrane import SimulationConfig, run_simulation
+
+# Grid axes, in the order they appear in the results table
+SWEEP_PARAMETERS = ["enantiomeric_excess", "glycine_fraction", "vesicle_diameter"]
+FINAL_STATE_FIELDS = ["final_membrane_thickness", "total_peptides_tested", "inserted",
+                      "cytoplasm", "discarded", "cytoplasm_full"]
+# Run settings shared by every point; a restart only skips rows that match them
+RUN_FIELDS = ["seed", "num_peptides", "mode"]
+RESULT_FIELDS = ["task"] + RUN_FIELDS + SWEEP_PARAMETERS + FINAL_STATE_FIELDS
+
+
+def build_grid(excess_values, glycine_values, diameter_values):
+    """All (enantiomeric_excess, glycine_fraction, vesicle_diameter) combinations."""
+    return list(itertools.product(excess_values, glycine_values, diameter_values))
+
+
+def task_seed(root_seed, point):
+    """
+    Per-task child of SeedSequence(root_seed). The spawn key is derived from
+    the grid point's values rather than its position, so a point keeps its
+    stream however the grid is scheduled, extended or restarted.
+    """
+    spawn_key = tuple(int(np.float64(value).view(np.uint64)) for value in point)
+    return np.random.SeedSequence(root_seed, spawn_key=spawn_key)
+
+
+def _point_key(values):
+    return tuple(float(v) for v in values)
+
+
+def run_settings(root_seed, config):
+    return {"seed": root_seed, "num_peptides": config.num_peptides, "mode": config.mode}
+
+
+def load_completed(results_path, root_seed, base_config):
+    """
+    Grid points already present in an existing results table for the same
+    root seed, num_peptides and mode. Rows from other runs are kept but do
+    not count as done.
+    """
+    results_path = Path(results_path)
+    if not results_path.exists() or results_path.stat().st_size == 0:
+        return set()
+    settings = {name: str(value) for name, value in run_settings(root_seed, base_config).items()}
+    with open(results_path, newline='') as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames != RESULT_FIELDS:
+            raise ValueError(f"{results_path} has columns {reader.fieldnames}, expected {RESULT_FIELDS}; "
+                             "write this sweep to a new --output")
+        return {_point_key(row[name] for name in SWEEP_PARAMETERS) for row in reader
+                if all(row[name] == value for name, value in settings.items())}
+
+
+def run_grid_point(task, root_seed, base_config, point):
+    """Worker entry point: run one grid point and return its results row."""
+    config = replace(base_config, **dict(zip(SWEEP_PARAMETERS, point)))
+    result = run_simulation(config, task_seed(root_seed, point))
+
+    row = {"task": task}
+    row.update(run_settings(root_seed, base_config))
+    row.update(zip(SWEEP_PARAMETERS, point))
+    row.update(result.final_state)
+    return row
+
+
+def run_sweep(grid, results_path, base_config=None, root_seed=0, max_workers=None):
+    """
+    Run every grid point not already in `results_path` (for this root seed,
+    num_peptides and mode) across a process pool. Rows are appended to the
+    table as soon as each point finishes, so an interrupted sweep can be
+    restarted with the same arguments.
+    Returns the number of points run.
+    """
+    if base_config is None:
+        base_config = SimulationConfig(log_mode="final")
+    results_path = Path(results_path)
+
+    completed = load_completed(results_path, root_seed, base_config)
+    pending = [(task, point) for task, point in enumerate(grid) if _point_key(point) not in completed]
+    if not pending:
+        return 0
+
+    write_header = not results_path.exists() or results_path.stat().st_size == 0
+    with open(results_path, "a", newline='') as f, ProcessPoolExecutor(max_workers=max_workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        if write_header:
+            writer.writeheader()
+            f.flush()
+
+        futures = [pool.submit(run_grid_point, task, root_seed, base_config, point)
+                   for task, point in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = future.result()
+            writer.writerow(row)
+            f.flush()
+            print(f"[{done}/{len(pending)}] excess={row['enantiomeric_excess']} "
+                  f"glycine={row['glycine_fraction']} diameter={row['vesicle_diameter']} "
+                  f"-> thickness {row['final_membrane_thickness']}")
+
+    return len(pending)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep for the peptide–membrane simulation")
+    parser.add_argument('--excess', type=float, nargs='+', default=[0.5],
+                        help="ENANTIOMERIC_EXCESS values")
+    parser.add_argument('--glycine', type=float, nargs='+', default=[0.01],
+                        help="GLYCINE_FRACTION values")
+    parser.add_argument('--diameter', type=float, nargs='+', default=[100],
+                        help="VESICLE_DIAMETER values (nm)")
+    parser.add_argument('--num-peptides', type=int, default=SimulationConfig.num_peptides)
+    parser.add_argument('--mode', choices=['scalar', 'batch'], default='batch')
+    parser.add_argument('--seed', type=int, default=0, help="Root seed for the whole sweep")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', type=str, default="logs/sweep_results.csv",
+                        help="Consolidated results table (appended to on restart)")
+    args = parser.parse_args()
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    base_config = SimulationConfig(num_peptides=args.num_peptides, mode=args.mode, log_mode="final")
+    grid = build_grid(args.excess, args.glycine, args.diameter)
+
+    ran = run_sweep(grid, args.output, base_config, root_seed=args.seed, max_workers=args.workers)
+    print(f"[✔] Sweep complete: {ran} new of {len(grid)} grid points -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+import lineage_binary
+from lineage_binary import read_lineage_binary, write_lineage_binary
+
+
+def assert_same_lineage(loaded, tree):
+    assert type(loaded) is type(tree)
+    assert list(loaded.nodes(data=True)) == list(tree.nodes(data=True))
+    assert list(loaded.edges(data=True)) == list(tree.edges(data=True))
+    assert loaded.graph == tree.graph
+
+
+def annotated_tree():
+    tree = nx.DiGraph(name="lineage", source={"table": "syncytial_lineage_min.csv", "rows": 6})
+    tree.add_node("Zygote", fate="progenitor", division_time=0.0, generation=0)
+    tree.add_edge("Zygote", "AB")
+    tree.add_edge("Zygote", "P1")
+    tree.add_edge("AB", "ABa")
+    tree.add_edge("AB", "ABp")
+    tree.add_edge("P1", "Sync_7", weight=0.5)
+    # Some cells lack attributes (masked columns); strings become categories
+    tree.nodes["AB"].update(fate="neuron", division_time=17.5, generation=1)
+    tree.nodes["ABa"].update(fate="neuron", syncytial=False)
+    tree.nodes["P1"].update(fate="germline", division_time=19.0)
+    # Values that are not bool/int/float/str fall back to JSON
+    tree.nodes["Sync_7"].update(syncytial=True, nuclei_count=np.int64(4), markers=["pie-1", "pgl-1"],
+                                expression={"pie-1": 0.8}, generation=None)
+    return tree
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_forest_round_trips_every_attribute(tmp_path, mmap):
+    tree = annotated_tree()
+    write_lineage_binary(tree, tmp_path / "lineage")
+    columns = read_lineage_binary(tmp_path / "lineage", mmap=mmap)
+    assert columns.parent is not None
+    assert_same_lineage(columns.to_networkx(), tree)
+
+    fates, present = columns.column("fate")
+    assert present.tolist() == [True, True, True, True, False, False]
+    assert list(fates) == ["progenitor", "neuron", "germline", "neuron"]
+
+
+def test_non_forest_edge_list_round_trips(tmp_path):
+    tree = annotated_tree()
+    # A second parent for Sync_7, and children listed out of parent order
+    tree.add_edge("ABp", "Sync_7", weight=2.0)
+    tree.add_edge("Zygote", "EMS")
+    write_lineage_binary(tree, tmp_path / "lineage")
+    columns = read_lineage_binary(tmp_path / "lineage")
+    assert columns.parent is None
+    assert_same_lineage(columns.to_networkx(), tree)
+
+
+def test_interleaved_forest_keeps_node_and_edge_order(tmp_path):
+    # A forest whose node order interleaves two trees (E is numbered after C and D)
+    tree = nx.DiGraph([("A", "B"), ("C", "D"), ("A", "E")])
+    write_lineage_binary(tree, tmp_path / "lineage")
+    assert_same_lineage(read_lineage_binary(tmp_path / "lineage").to_networkx(), tree)
+
+
+def test_undirected_graph_with_integer_names(tmp_path):
+    tree = nx.Graph()
+    tree.add_edge(1, 2, kind="sister")
+    tree.add_edge(2, 3)
+    tree.nodes[1]["fate"] = "gut"
+    write_lineage_binary(tree, tmp_path / "lineage")
+    assert_same_lineage(read_lineage_binary(tmp_path / "lineage").to_networkx(), tree)
+
+
+def test_concurrent_writer_finishing_first_is_kept(tmp_path, monkeypatch):
+    tree = annotated_tree()
+    path = tmp_path / "lineage"
+    replace = lineage_binary.os.replace
+
+    def replace_after_other_writer(src, dst):
+        # Another process misses the same key and renames its copy in first
+        monkeypatch.setattr(lineage_binary.os, "replace", replace)
+        write_lineage_binary(tree, dst)
+        replace(src, dst)
+
+    monkeypatch.setattr(lineage_binary.os, "replace", replace_after_other_writer)
+    write_lineage_binary(tree, path)
+    assert_same_lineage(read_lineage_binary(path).to_networkx(), tree)
+    assert [p.name for p in tmp_path.iterdir()] == ["lineage"]
@@ -0,0 +1,28 @@
+import networkx as nx
+
+from lineage_cache import cached_columns
+from lineage_index import LineageIndex
+
+
+def test_cached_columns_builds_once_and_reads_without_networkx(tmp_path):
+    builds = []
+
+    def build():
+        builds.append(1)
+        tree = nx.DiGraph([("Zygote", "AB"), ("Zygote", "P1"), ("AB", "ABa")])
+        nx.set_node_attributes(tree, {"AB": "neuron", "P1": "germline"}, "fate")
+        return tree
+
+    params = {"builder": "test", "seed": 0}
+    first = cached_columns(params, build, cache_dir=tmp_path)
+    second = cached_columns(params, build, cache_dir=tmp_path)
+    assert len(builds) == 1
+
+    for columns in (first, second):
+        assert columns.names == ["Zygote", "AB", "P1", "ABa"]
+        fates, present = columns.column("fate")
+        assert list(fates) == ["neuron", "germline"] and present.tolist() == [False, True, True, False]
+        assert LineageIndex.from_parents(columns).lca("ABa", "P1") == "Zygote"
+
+    cached_columns(dict(params, seed=1), build, cache_dir=tmp_path)
+    assert len(builds) == 2
@@ -0,0 +1,80 @@
+import networkx as nx
+import numpy as np
+import pytest
+
+from lineage_index import LineageIndex
+
+
+def random_forest(rng, n, root_probability=0.1):
+    """Parent array of a random forest whose cells are numbered in shuffled order."""
+    parent = np.full(n, -1, dtype=np.int64)
+    for i in range(1, n):
+        if rng.random() >= root_probability:
+            parent[i] = rng.integers(i)
+    # Relabel so parents are not always numbered before their children
+    perm = rng.permutation(n)
+    shuffled = np.full(n, -1, dtype=np.int64)
+    shuffled[perm] = np.where(parent >= 0, perm[parent], -1)
+    return shuffled
+
+
+def ancestors(parent, i):
+    """i and its ancestors, nearest first, by walking parent links."""
+    chain = [i]
+    while parent[chain[-1]] >= 0:
+        chain.append(int(parent[chain[-1]]))
+    return chain
+
+
+def naive_lca(parent, a, b):
+    above_a = set(ancestors(parent, a))
+    return next((c for c in ancestors(parent, b) if c in above_a), -1)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_batch_queries_match_ancestor_walks(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 60))
+    parent = random_forest(rng, n)
+    index = LineageIndex([f"c{i}" for i in range(n)], parent)
+
+    # Every ordered pair, so a == b and cells in different trees are covered
+    pairs = np.array([(a, b) for a in range(n) for b in range(n)], dtype=np.int64)
+    lca = index.lca_batch(pairs)
+    is_ancestor = index.is_ancestor_batch(pairs)
+    for (a, b), got_lca, got_ancestor in zip(pairs.tolist(), lca.tolist(), is_ancestor.tolist()):
+        assert got_lca == naive_lca(parent, a, b)
+        assert got_ancestor == (a in ancestors(parent, b))
+
+
+def test_forest_and_named_queries():
+    names = ["Zygote", "AB", "P1", "ABa", "ABp", "Other", "OtherA"]
+    parent = [-1, 0, 0, 1, 1, -1, 5]
+    index = LineageIndex(names, parent)
+
+    assert index.lca("ABa", "ABp") == "AB"
+    assert index.lca("ABa", "P1") == "Zygote"
+    assert index.lca("ABa", "ABa") == "ABa"
+    assert index.lca("AB", "ABp") == "AB"
+    assert index.lca("ABa", "OtherA") is None
+    assert index.lca_batch(np.array([["ABa", "OtherA"], ["Other", "Other"]])).tolist() == [-1, 5]
+    assert index.is_ancestor("ABa", "ABa")
+    assert not index.is_ancestor("Zygote", "OtherA")
+    assert index.subtree("AB") == ["AB", "ABa", "ABp"]
+    assert index.subtree_size("Zygote") == 5
+
+
+def test_from_graph_matches_parent_array():
+    tree = nx.DiGraph([("Zygote", "AB"), ("Zygote", "P1"), ("AB", "ABa"), ("P1", "EMS")])
+    index = LineageIndex.from_graph(tree)
+    assert index.lca("ABa", "EMS") == "Zygote"
+    assert index.subtree("P1") == ["P1", "EMS"]
+
+    tree.add_edge("ABa", "EMS")
+    with pytest.raises(ValueError, match="more than one parent"):
+        LineageIndex.from_graph(tree)
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        LineageIndex(["A", "B"], [1, 0])
@@ -0,0 +1,21 @@
+import pytest
+
+from lineage_store import LineageStore
+
+
+@pytest.mark.parametrize("table", ["Cell,Parent\nA,B\nB,A\n", "Cell,Parent\nA,A\n",
+                                   "Cell,Parent\nZygote,\nA,Zygote\nB,C\nC,B\n"])
+def test_parent_cycles_are_rejected_at_load(tmp_path, table):
+    path = tmp_path / "lineage.csv"
+    path.write_text(table)
+    with pytest.raises(ValueError, match="cycle"):
+        LineageStore.load(path)
+
+
+def test_subtree_in_file_order(tmp_path):
+    path = tmp_path / "lineage.jsonl"
+    path.write_text('{"Cell": "Zygote"}\n{"Cell": "AB", "Parent": "Zygote"}\n'
+                    '{"Cell": "P1", "Parent": "Zygote"}\n{"Cell": "ABa", "Parent": "AB"}\n')
+    store = LineageStore.load(path)
+    assert store.subtree("Zygote") == ["Zygote", "AB", "ABa", "P1"]
+    assert store.subtree("P1") == ["P1"]
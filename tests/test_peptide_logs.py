@@ -0,0 +1,23 @@
+import pytest
+
+from peptide_logs import STATE_HISTORY_FILE, StateHistory, open_log_sink
+from simulate_peptide_membrane import SimulationConfig, run_simulation
+
+
+@pytest.mark.parametrize("mode", ["scalar", "batch"])
+def test_state_history_rebuilds_every_state_row(tmp_path, mode):
+    config = SimulationConfig(num_peptides=5000, mode=mode, batch_size=512)
+    expected = run_simulation(config, rng=11).vesicle_state_log
+
+    with open_log_sink("csv", tmp_path, config.max_peptide_length, state_history=True) as sink:
+        run_simulation(config, rng=11, sink=sink)
+    history = StateHistory.load(tmp_path / STATE_HISTORY_FILE)
+
+    # Change points only, far fewer than one row per step
+    assert len(history) < len(expected)
+    assert history.last_step == config.num_peptides - 1
+    for row in expected:
+        assert history.state_at(row["step"]) == row
+        assert history.thickness_at(row["step"]) == row["membrane_thickness"]
+    with pytest.raises(IndexError):
+        history.state_at(config.num_peptides)
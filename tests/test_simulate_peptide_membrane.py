@@ -0,0 +1,103 @@
+import csv
+import json
+from pathlib import Path
+
+import pytest
+
+from peptide_logs import open_log_sink
+from simulate_peptide_membrane import (CHIRAL_POOL, ChiralBlockTracker, SimulationConfig, load_checkpoint,
+                                       longest_chiral_block, run_simulation, write_outputs)
+
+BASELINE_DIR = Path(__file__).resolve().parent.parent / "logs"
+LOG_FILES = ["peptide_log.csv", "membrane_growth_log.csv", "vesicle_state_log.csv"]
+
+
+class ReplayRandom:
+    """Stands in for random.Random, handing back recorded residues one draw at a time."""
+
+    def __init__(self, residues):
+        self.residues = iter(residues)
+
+    def choices(self, population, weights=None, k=1):
+        return [next(self.residues) for _ in range(k)]
+
+
+def read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_scalar_engine_reproduces_baseline_logs(tmp_path):
+    # The baseline run was unseeded, so feed its recorded residues back
+    # through the scalar engine and expect every log row to come out the same
+    baseline = read_csv(BASELINE_DIR / "peptide_log.csv")
+    residues = [aa for row in baseline for aa in row["sequence"].split("-")]
+
+    result = run_simulation(SimulationConfig(), rng=ReplayRandom(residues))
+    write_outputs(result, tmp_path)
+
+    for name in LOG_FILES:
+        assert read_csv(tmp_path / name) == read_csv(BASELINE_DIR / name), name
+    with open(BASELINE_DIR / "final_state.json") as f:
+        assert result.final_state == json.load(f)
+
+
+def test_baseline_max_block_matches_rescan():
+    for row in read_csv(BASELINE_DIR / "peptide_log.csv"):
+        peptide = row["sequence"].split("-")
+        assert int(row["length"]) == len(peptide)
+        assert int(row["max_block"]) == max(longest_chiral_block(peptide, 'L'), longest_chiral_block(peptide, 'D'))
+
+
+def test_tracker_matches_rescan_on_seeded_run():
+    config = SimulationConfig(num_peptides=500)
+    result = run_simulation(config, rng=7)
+    assert run_simulation(config, rng=7).peptide_log == result.peptide_log
+
+    for row in result.peptide_log:
+        peptide = row["sequence"].split("-")
+        assert set(peptide) <= set(CHIRAL_POOL)
+        tracker = ChiralBlockTracker()
+        for n, aa in enumerate(peptide, 1):
+            assert tracker.push(aa) == max(longest_chiral_block(peptide[:n], 'L'),
+                                           longest_chiral_block(peptide[:n], 'D'))
+        assert tracker.max_block == row["max_block"]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_batch_resume_at_block_boundary(tmp_path):
+    # Checkpoints land exactly on block boundaries (checkpoint_every == batch_size)
+    config = SimulationConfig(num_peptides=1024, mode="batch", batch_size=256)
+    with open_log_sink("csv", tmp_path / "full", config.max_peptide_length) as sink:
+        run_simulation(config, rng=3, sink=sink)
+
+    checkpoint_path = tmp_path / "checkpoint.json"
+    with open_log_sink("csv", tmp_path / "resumed", config.max_peptide_length) as sink:
+        write = sink.write
+
+        def write_until_600(peptide_row, growth_row, state_row):
+            if peptide_row["index"] == 600:
+                raise Interrupted
+            write(peptide_row, growth_row, state_row)
+
+        sink.write = write_until_600
+        with pytest.raises(Interrupted):
+            run_simulation(config, rng=3, sink=sink, checkpoint_path=checkpoint_path, checkpoint_every=256)
+
+    checkpoint = load_checkpoint(checkpoint_path)
+    assert checkpoint["step"] == 512
+    with open_log_sink("csv", tmp_path / "resumed", config.max_peptide_length, resume=checkpoint["sink"]) as sink:
+        run_simulation(config, rng=None, sink=sink, checkpoint_path=checkpoint_path, checkpoint_every=256,
+                       resume_from=checkpoint)
+
+    for name in LOG_FILES:
+        assert (tmp_path / "resumed" / name).read_bytes() == (tmp_path / "full" / name).read_bytes(), name
+
+
+def test_state_history_rejects_sampled_logs_before_opening_files(tmp_path):
+    with pytest.raises(ValueError, match="every step"):
+        open_log_sink("csv", tmp_path / "logs", 120, state_history=True, log_mode="sampled")
+    assert not (tmp_path / "logs").exists()
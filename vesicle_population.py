@@ -0,0 +1,196 @@
+import csv
+import json
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from simulate_peptide_membrane import (OUTPUT_DIR, SimulationConfig, chiral_run_lengths,
+                                       generate_peptide_block)
+
+# ==================== CONFIGURATION ====================
+
+NUM_VESICLES = 1000
+PEPTIDES_PER_VESICLE = 2000  # size of the shared pool, per vesicle
+CAPTURE_MODE = "uniform"  # "uniform" or "area" (larger vesicles capture proportionally more peptides)
+
+VESICLE_FIELDS = ["vesicle", "vesicle_diameter", "final_membrane_thickness", "inserted",
+                  "cytoplasm", "discarded", "cytoplasm_full"]
+
+# ==================== POPULATION STATE ====================
+
+class VesiclePopulation:
+    """
+    Per-vesicle state for a population sharing one peptide pool, held in
+    NumPy arrays so whole batches of peptides are applied at once.
+    Each vesicle follows the same rules as VesicleState.apply_peptide.
+    """
+
+    def __init__(self, config, num_vesicles, diameters=None):
+        self.config = config
+        if diameters is None:
+            diameters = np.full(num_vesicles, config.vesicle_diameter, dtype=float)
+        self.diameters = np.asarray(diameters, dtype=float)
+        if self.diameters.shape != (num_vesicles,):
+            raise ValueError("Need one diameter per vesicle")
+
+        area = 4 * 3.1415 * (self.diameters / 2) ** 2
+        self.membrane_area = area
+        self.membrane_capacity = (area * config.max_peptides_per_area).astype(np.int64)
+
+        self.thickness = np.full(num_vesicles, config.initial_membrane_thickness, dtype=np.int16)
+        self.inserted = np.zeros(num_vesicles, dtype=np.int32)
+        self.cytoplasmic = np.zeros(num_vesicles, dtype=np.int32)
+        self.discarded = np.zeros(num_vesicles, dtype=np.int32)
+        self.cytoplasm_full = np.zeros(num_vesicles, dtype=bool)
+
+    def __len__(self):
+        return len(self.thickness)
+
+    def _apply_distinct(self, targets, running_max):
+        """Apply one peptide to each of `targets` (no vesicle repeated)."""
+        config = self.config
+        max_length = running_max.shape[1]
+
+        threshold = self.thickness[targets] * config.block_growth_threshold
+        reached = running_max[:, -1] >= threshold
+        # First residue at which the block reaches the threshold (max_length if never)
+        length = np.minimum((running_max < threshold[:, None]).sum(axis=1) + 1, max_length)
+
+        inserted = reached & (self.inserted[targets] < self.membrane_capacity[targets])
+        self.inserted[targets] += inserted
+        self.thickness[targets] += inserted & (self.thickness[targets] < config.max_membrane_thickness)
+
+        complete = ~inserted & (length >= max_length)
+        to_cytoplasm = complete & ~self.cytoplasm_full[targets]
+        self.cytoplasmic[targets] += to_cytoplasm
+        self.cytoplasm_full[targets] |= to_cytoplasm & (self.cytoplasmic[targets] >= config.cytoplasm_capacity)
+        self.discarded[targets] += ~inserted & ~to_cytoplasm
+
+    def dispatch(self, targets, block):
+        """
+        Deliver the peptides in `block` (residue codes, one row per peptide)
+        to vesicles `targets` in order. A vesicle receiving several peptides
+        gets them in sequence: peptides are grouped by how many earlier
+        peptides in the batch went to the same vesicle and applied rank by rank.
+        """
+        targets = np.asarray(targets)
+        running_max = np.maximum.accumulate(chiral_run_lengths(block), axis=1)
+
+        order = np.argsort(targets, kind='stable')
+        sorted_targets = targets[order]
+        group_start = np.r_[True, sorted_targets[1:] != sorted_targets[:-1]]
+        start_index = np.maximum.accumulate(np.where(group_start, np.arange(len(targets)), 0))
+        rank = np.empty(len(targets), dtype=np.int64)
+        rank[order] = np.arange(len(targets)) - start_index
+
+        for r in range(int(rank.max(initial=-1)) + 1):
+            chosen = np.flatnonzero(rank == r)
+            self._apply_distinct(targets[chosen], running_max[chosen])
+
+    # ==================== REPORTING ====================
+
+    def thickness_distribution(self):
+        """Number of vesicles at each membrane thickness, from the initial value up."""
+        start = self.config.initial_membrane_thickness
+        counts = np.bincount(self.thickness - start,
+                             minlength=self.config.max_membrane_thickness - start + 1)
+        return {start + i: int(n) for i, n in enumerate(counts)}
+
+    def summary(self):
+        """Population-level distributions of the final vesicle states."""
+        def describe(values):
+            return {
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "min": int(values.min()),
+                "p50": float(np.percentile(values, 50)),
+                "p90": float(np.percentile(values, 90)),
+                "max": int(values.max()),
+            }
+
+        return {
+            "num_vesicles": len(self),
+            "total_peptides_tested": int(self.inserted.sum() + self.cytoplasmic.sum() + self.discarded.sum()),
+            "membrane_thickness": describe(self.thickness),
+            "thickness_distribution": self.thickness_distribution(),
+            "inserted": describe(self.inserted),
+            "cytoplasm": describe(self.cytoplasmic),
+            "discarded": describe(self.discarded),
+            "fraction_cytoplasm_full": float(self.cytoplasm_full.mean()),
+        }
+
+    def iter_rows(self):
+        """Per-vesicle final states, mirroring final_state.json."""
+        for i in range(len(self)):
+            yield {
+                "vesicle": i,
+                "vesicle_diameter": float(self.diameters[i]),
+                "final_membrane_thickness": int(self.thickness[i]),
+                "inserted": int(self.inserted[i]),
+                "cytoplasm": int(self.cytoplasmic[i]),
+                "discarded": int(self.discarded[i]),
+                "cytoplasm_full": bool(self.cytoplasm_full[i]),
+            }
+
+# ==================== SIMULATION ====================
+
+def simulate_population(config, num_vesicles, rng=None, diameters=None, capture=CAPTURE_MODE):
+    """
+    Run a population of `num_vesicles` vesicles drawing on one shared pool
+    of config.num_peptides peptides, generated config.batch_size at a time.
+    Each peptide goes to a random vesicle: uniformly, or with
+    capture="area" in proportion to membrane area.
+    Returns the VesiclePopulation.
+    """
+    if not isinstance(rng, np.random.Generator):
+        rng = np.random.default_rng(rng)
+
+    population = VesiclePopulation(config, num_vesicles, diameters)
+    if capture == "uniform":
+        capture_p = None
+    elif capture == "area":
+        capture_p = population.membrane_area / population.membrane_area.sum()
+    else:
+        raise ValueError(f"Unknown capture mode: {capture!r}")
+
+    remaining = config.num_peptides
+    while remaining > 0:
+        batch = min(remaining, config.batch_size)
+        block = generate_peptide_block(rng, batch, config.max_peptide_length, config.chiral_weights)
+        targets = rng.choice(num_vesicles, size=batch, p=capture_p)
+        population.dispatch(targets, block)
+        remaining -= batch
+
+    return population
+
+
+def write_population(population, output_dir=OUTPUT_DIR):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(output_dir / "population_vesicles.csv", "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=VESICLE_FIELDS)
+        writer.writeheader()
+        writer.writerows(population.iter_rows())
+
+    with open(output_dir / "population_summary.json", "w") as f:
+        json.dump(population.summary(), f, indent=4)
+
+
+def main():
+    base = SimulationConfig()
+    config = replace(base, num_peptides=NUM_VESICLES * PEPTIDES_PER_VESICLE, batch_size=16384)
+    population = simulate_population(config, NUM_VESICLES, capture=CAPTURE_MODE)
+    write_population(population, OUTPUT_DIR)
+
+    summary = population.summary()
+    print(f"[✔] Population simulation complete: {summary['num_vesicles']} vesicles, "
+          f"{summary['total_peptides_tested']} peptides")
+    print(f"Membrane thickness: mean {summary['membrane_thickness']['mean']:.2f}, "
+          f"distribution {summary['thickness_distribution']}")
+    print(f"Cytoplasm full in {summary['fraction_cytoplasm_full']:.1%} of vesicles")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,34 +3,13 @@ import networkx as nx
 from matplotlib.patches import Patch
 from matplotlib.lines import Line2D
 
-# Color palette for cell fates
-FATE_COLORS = {
-    "neuron": "purple",
-    "muscle": "red",
-    "skin": "tan",
-    "gut": "green",
-    "germline": "blue",
-    "progenitor": "lightblue",
-    "undifferentiated": "gray",
-    None: "lightgray"  # fallback
-}
-
-
-def hierarchy_pos(G, root="Zygote", width=1., vert_gap=0.2, vert_loc=0, xcenter=0.5, pos=None, parent=None):
-    if pos is None:
-        pos = {root: (xcenter, vert_loc)}
-    else:
-        pos[root] = (xcenter, vert_loc)
-
-    children = list(G.successors(root))
-    if len(children) != 0:
-        dx = width / len(children)
-        next_x = xcenter - width / 2 - dx / 2
-        for child in children:
-            next_x += dx
-            pos = hierarchy_pos(G, root=child, width=dx, vert_gap=vert_gap,
-                                vert_loc=vert_loc - vert_gap, xcenter=next_x, pos=pos, parent=root)
-    return pos
+from fate_utils import FATE_COLORS
+from lineage_layout import hierarchy_pos, tree_layout
+from lineage_render import BACKGROUND_COLOR, draw_lineage_fast
+
+# Above this many cells visualize_lineage_tree switches to fast mode by default
+FAST_RENDER_NODES = 500
+
 
 def visualize_lineage_tree(
     G,
@@ -38,7 +17,9 @@ def visualize_lineage_tree(
     title="C. elegans Lineage Tree (Hierarchical)",
     save_path=None,
     dpi=300,
-    show=True
+    show=True,
+    fast=None,
+    label_depth=None
 ):
     """
     Visualize the lineage tree with:
@@ -49,38 +30,27 @@ def visualize_lineage_tree(
 
     Parameters:
         G: networkx.DiGraph
-        color_by_fate: bool — use fate coloring
+        color_by_fate: bool — use fate coloring; False draws every cell in
+            one neutral color and leaves fates out of the legend
         title: str — plot title
         save_path: str or None — file path to save image (e.g. "tree.png")
         dpi: int — resolution for saved figure
         show: bool — whether to display the figure in a window
+        fast: bool or None — draw with a few collection artists and culled
+            labels (see lineage_render.draw_lineage_fast); None picks it
+            for trees over FAST_RENDER_NODES cells
+        label_depth: int or None — in fast mode, only label cells down to
+            this depth
     """
-    pos = hierarchy_pos(G, root="Zygote")
-
-    # Separate nodes by syncytial status (shape)
-    circle_nodes, square_nodes = [], []
-    circle_colors, square_colors = [], []
-
-    for node in G.nodes:
-        color = FATE_COLORS.get(G.nodes[node].get("fate"), "lightgray")
-        if G.nodes[node].get("syncytial"):
-            square_nodes.append(node)
-            square_colors.append(color)
-        else:
-            circle_nodes.append(node)
-            circle_colors.append(color)
-
-    fig = plt.figure(figsize=(14, 10))
-    ax = plt.gca()
-
-    nx.draw_networkx_edges(G, pos, edge_color='gray', ax=ax)
-
-    nx.draw_networkx_nodes(G, pos, nodelist=circle_nodes, node_color=circle_colors,
-                           node_shape='o', node_size=2500, ax=ax)
-    nx.draw_networkx_nodes(G, pos, nodelist=square_nodes, node_color=square_colors,
-                           node_shape='s', node_size=2500, ax=ax)
-
-    nx.draw_networkx_labels(G, pos, font_size=9, ax=ax)
+    # An empty palette falls back to the neutral color for every cell
+    colors = FATE_COLORS if color_by_fate else {}
+    if fast is None:
+        fast = G.number_of_nodes() > FAST_RENDER_NODES
+    if fast:
+        fig, ax = plt.subplots(figsize=(14, 10))
+        draw_lineage_fast(ax, G, tree_layout(G, root="Zygote"), colors, label_depth=label_depth)
+    else:
+        _draw_lineage_networkx(G, colors)
 
     plt.title(title)
     plt.axis('off')
@@ -88,7 +58,7 @@ def visualize_lineage_tree(
     # Legends
     fate_legend = [
         Patch(facecolor=color, edgecolor='black', label=fate.capitalize() if fate else "Unknown")
-        for fate, color in FATE_COLORS.items() if fate is not None
+        for fate, color in colors.items() if fate is not None
     ]
     shape_legend = [
         Line2D([0], [0], marker='o', color='w', label='Normal Cell',
@@ -111,3 +81,32 @@ def visualize_lineage_tree(
     else:
         plt.close()
 
+
+def _draw_lineage_networkx(G, colors=FATE_COLORS):
+    """Original per-node drawing: big labelled nodes, fine for a few hundred cells."""
+    pos = hierarchy_pos(G, root="Zygote")
+
+    # Separate nodes by syncytial status (shape)
+    circle_nodes, square_nodes = [], []
+    circle_colors, square_colors = [], []
+
+    for node in G.nodes:
+        color = colors.get(G.nodes[node].get("fate"), BACKGROUND_COLOR)
+        if G.nodes[node].get("syncytial"):
+            square_nodes.append(node)
+            square_colors.append(color)
+        else:
+            circle_nodes.append(node)
+            circle_colors.append(color)
+
+    fig = plt.figure(figsize=(14, 10))
+    ax = plt.gca()
+
+    nx.draw_networkx_edges(G, pos, edge_color='gray', ax=ax)
+
+    nx.draw_networkx_nodes(G, pos, nodelist=circle_nodes, node_color=circle_colors,
+                           node_shape='o', node_size=2500, ax=ax)
+    nx.draw_networkx_nodes(G, pos, nodelist=square_nodes, node_color=square_colors,
+                           node_shape='s', node_size=2500, ax=ax)
+
+    nx.draw_networkx_labels(G, pos, font_size=9, ax=ax)